@@ -0,0 +1,185 @@
+#!/usr/bin/env python3
+"""Warm the album art cache so a fresh SD card doesn't download art on every track
+
+    python cache_warmup.py                        # recently played + saved albums
+    python cache_warmup.py --import art.tar.gz    # offline, no Spotify needed
+    python cache_warmup.py --no-spotify --import /media/usb/art
+
+Offline imports are a directory or tarball of images plus a manifest.json
+mapping each album art URL to its file, e.g.
+    {"https://i.scdn.co/image/ab67616d0000b273...": "abbey-road.jpg"}
+"""
+import os
+import sys
+import json
+import time
+import tarfile
+import argparse
+from utils.logger import setup_logger
+
+logger = setup_logger('warmup', 'warmup.log')
+
+from spotify_client import SpotifyClient
+from utils.art_cache import ArtCache
+from utils.art_pipeline import ArtPipeline
+from config import SPOTIFY_SCOPE, SPOTIFY_LIBRARY_SCOPE
+
+MANIFEST_NAME = 'manifest.json'
+
+def _album_art_url(album):
+    """Get the largest image URL for an album object, or None"""
+    images = (album or {}).get('images') or []
+    return images[0]['url'] if images else None
+
+def library_art_urls(client, recent_limit=50, saved_album_limit=200):
+    """Collect unique album art URLs from recent history and saved albums"""
+    urls = []
+    seen = set()
+
+    def add(url):
+        if url and url not in seen:
+            seen.add(url)
+            urls.append(url)
+
+    if recent_limit:
+        recent = client.current_user_recently_played(limit=min(recent_limit, 50))
+        for item in recent.get('items', []):
+            add(_album_art_url((item.get('track') or {}).get('album')))
+        logger.info(f"Found {len(urls)} albums in recently played")
+
+    offset = 0
+    while offset < saved_album_limit:
+        page = client.current_user_saved_albums(limit=min(50, saved_album_limit - offset), offset=offset)
+        items = page.get('items', [])
+        for item in items:
+            add(_album_art_url(item.get('album')))
+        offset += len(items)
+        if not items or not page.get('next'):
+            break
+    logger.info(f"Found {len(urls)} unique albums including saved albums")
+    return urls
+
+class CacheWarmup:
+    def __init__(self, art_cache=None, workers=None):
+        """Fill the art cache on the art pipeline's worker processes and report throughput"""
+        self.art_cache = art_cache or ArtCache()
+        self.pipeline = ArtPipeline(self.art_cache, workers)
+        self.added = 0
+        self.skipped = 0
+        self.failed = 0
+        self.elapsed = 0
+
+    def _uncached(self, items):
+        """Yield URLs or (url, ...) entries that aren't cached yet, counting the rest as skipped"""
+        for item in items:
+            if self.art_cache.contains(item if isinstance(item, str) else item[0]):
+                self.skipped += 1
+                continue
+            yield item
+
+    def _run(self, items):
+        """Feed URLs or (url, bytes) pairs through the pipeline, timing the whole batch"""
+        started = time.monotonic()
+        for url, data in self.pipeline.process(items, skip_cached=False):
+            if data is None:
+                self.failed += 1
+            else:
+                self.added += 1
+        self.elapsed += time.monotonic() - started
+
+    def fetch(self, urls):
+        """Download and pre-resize art for every URL not already cached"""
+        logger.info(f"Warming {len(urls)} album art URLs with {self.pipeline.workers} worker processes")
+        self._run(self._uncached(urls))
+
+    def _read_images(self, manifest, read):
+        """Yield (url, image bytes) for uncached manifest entries, counting unreadable ones as failed
+
+        Images are read lazily as the pipeline has room for them.
+        """
+        for url, name in self._uncached(manifest.items()):
+            try:
+                data = read(name)
+            except (OSError, KeyError, tarfile.TarError) as e:
+                logger.error(f"Failed to read {name} for {url}: {e}")
+                self.failed += 1
+                continue
+            yield url, data
+
+    def import_offline(self, source):
+        """Import art from a directory or tarball with a URL manifest
+
+        Returns False, having logged why, if the source or its manifest
+        can't be read.
+        """
+        try:
+            if os.path.isdir(source):
+                with open(os.path.join(source, MANIFEST_NAME)) as f:
+                    manifest = json.load(f)
+
+                def read(name):
+                    with open(os.path.join(source, name), 'rb') as f:
+                        return f.read()
+
+                logger.info(f"Importing {len(manifest)} images from {source}")
+                self._run(self._read_images(manifest, read))
+                return True
+
+            with tarfile.open(source) as archive:
+                manifest_member = next((m for m in archive.getmembers() if os.path.basename(m.name) == MANIFEST_NAME), None)
+                if manifest_member is None:
+                    raise FileNotFoundError(f"no {MANIFEST_NAME} in archive")
+                prefix = os.path.dirname(manifest_member.name)
+                manifest = json.load(archive.extractfile(manifest_member))
+
+                def read(name):
+                    member = archive.extractfile(os.path.join(prefix, name) if prefix else name)
+                    if member is None:
+                        raise KeyError(f"{name} is not a regular file")
+                    return member.read()
+
+                logger.info(f"Importing {len(manifest)} images from {source}")
+                self._run(self._read_images(manifest, read))
+                return True
+        except (OSError, ValueError, tarfile.TarError) as e:
+            logger.error(f"Can't import from {source}: {e}")
+            return False
+
+    def report(self):
+        """Summarize throughput and the resulting cache size"""
+        rate = self.added / self.elapsed if self.elapsed else 0
+        count, total = self.art_cache.disk_usage()
+        return (f"Added {self.added} images ({self.skipped} already cached, {self.failed} failed) "
+                f"in {self.elapsed:.1f}s, {rate:.1f} images/s. "
+                f"Cache now holds {count} frames, {total / 1024:.0f} KB")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--import', dest='import_source', help="Directory or tarball with a manifest.json")
+    parser.add_argument('--no-spotify', action='store_true', help="Skip pulling the library from Spotify")
+    parser.add_argument('--recent', type=int, default=50, help="Recently played tracks to warm (max 50)")
+    parser.add_argument('--albums', type=int, default=200, help="Saved albums to warm")
+    parser.add_argument('--workers', type=int, help="Worker processes (default: one per CPU core)")
+    args = parser.parse_args()
+
+    warmup = CacheWarmup(workers=args.workers)
+
+    if args.import_source and not warmup.import_offline(args.import_source):
+        print(f"Can't import from {args.import_source}: it needs a readable {MANIFEST_NAME}. See warmup.log.")
+
+    if not args.no_spotify:
+        client = SpotifyClient(scope=f'{SPOTIFY_SCOPE} {SPOTIFY_LIBRARY_SCOPE}')
+        if client.client:
+            warmup.fetch(library_art_urls(client.client, args.recent, args.albums))
+        else:
+            logger.error("No token with library access. Reconnect via the auth server page, then retry.")
+            print("No token with library access. Reconnect via the auth server page, then retry.")
+
+    warmup.pipeline.close()
+    summary = warmup.report()
+    logger.info(summary)
+    print(summary)
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -47,7 +47,8 @@ APP_AUTHOR = "mever"
 
 # Use local directories instead of system-wide ones
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
-CACHE_DIR = os.path.join(BASE_DIR, 'cache')
+# Overridable so benchmarks and tests don't write into the real cache
+CACHE_DIR = os.getenv("SPOTIFY_MATRIX_CACHE_DIR", os.path.join(BASE_DIR, 'cache'))
 LOG_DIR = os.path.join(BASE_DIR, 'logs')
 
 # Ensure directories exist with proper permissions
@@ -56,6 +57,7 @@ os.makedirs(LOG_DIR, mode=0o777, exist_ok=True)
 
 # Server configuration
 AUTH_SERVER_PORT = 8080
+AUTH_SERVER_THREADS = 4  # Worker threads in production (--production) mode
 
 # Matrix configuration
 def get_matrix_options():
@@ -64,12 +66,56 @@ def get_matrix_options():
         "cols": 64,
         "hardware_mapping": "adafruit-hat-pwm",
         "brightness": 70,
+        # Critical display options for reduced flickering
+        "disable_hardware_pulsing": False,  # Enable hardware pulsing
+        "pwm_bits": 11,  # Increase PWM bits for better color depth
+        "pwm_lsb_nanoseconds": 130,  # Adjust PWM timing
+        "limit_refresh_rate_hz": 100,  # Set refresh rate limit
     }
 
+# Where DisplayManager sends frames: "matrix" drives the panel in-process,
+# "shm" hands them to spotify_matrix_driver.py through a shared ring buffer
+DISPLAY_OUTPUT = os.getenv("SPOTIFY_MATRIX_OUTPUT", "matrix")
+FRAME_BUFFER_PATH = "/dev/shm/spotify-matrix-frames"
+FRAME_BUFFER_POLL_INTERVAL = 0.004  # Seconds between driver checks for a new frame
+FRAME_BUFFER_IDLE_POLL_INTERVAL = 0.25  # Same, while the display is idle and the panel blank
+
+# How album art is scaled down to 64x64 (see utils/resample.py):
+# "fast" for a Pi Zero, "quality" for sharper art, "area" for NumPy batches
+RESIZE_TIER = os.getenv("SPOTIFY_MATRIX_RESIZE", "quality")
+
 # Spotify configuration
 SPOTIFY_CLIENT_ID = os.getenv("SPOTIFY_CLIENT_ID", "e41bd5086b4942aaa474ecdb3e443114")
 SPOTIFY_CLIENT_SECRET = os.getenv("SPOTIFY_CLIENT_SECRET", "567e3e77940544c9a0d1163fe6c99020")
+# Playback access is all the display needs. Library access lets
+# cache_warmup.py pull recently played tracks and saved albums.
+SPOTIFY_SCOPE = "user-read-playback-state user-modify-playback-state"
+SPOTIFY_LIBRARY_SCOPE = "user-read-recently-played user-library-read"
 SPOTIFY_REDIRECT_URI = f"http://{get_local_ip()}:{AUTH_SERVER_PORT}/callback" if get_local_ip() else f"http://localhost:{AUTH_SERVER_PORT}/callback"
 
-# Network status check
-NETWORK_CHECK_URL = "https://api.spotify.com"  # Used to verify internet connectivity
\ No newline at end of file
+# Idle mode: poll every PLAYBACK_POLL_INTERVAL while music plays and for
+# IDLE_AFTER seconds after it stops, then blank the panel and back polling
+# off from IDLE_POLL_MIN to IDLE_POLL_MAX. A connected but paused device
+# holds it at IDLE_DEVICE_POLL_INTERVAL; SIGUSR1 wakes the display for
+# WAKE_WINDOW seconds.
+PLAYBACK_POLL_INTERVAL = 2
+IDLE_AFTER = 300
+IDLE_POLL_MIN = 15
+IDLE_POLL_MAX = 300
+IDLE_DEVICE_POLL_INTERVAL = 15
+WAKE_WINDOW = 120
+
+# Restart snapshot: what the display was showing, so a restart within
+# SNAPSHOT_MAX_AGE seconds puts it straight back and skips the startup sequence
+SNAPSHOT_PATH = os.path.join(CACHE_DIR, 'display_snapshot')
+SNAPSHOT_MAX_AGE = 900
+
+# Network status check: a DNS lookup plus TCP connect, no TLS or HTTP request
+NETWORK_CHECK_HOST = "api.spotify.com"
+NETWORK_CHECK_PORT = 443
+
+# Fleet hub configuration (one poller process serving many matrices/accounts)
+FLEET_CONFIG_FILE = os.path.join(BASE_DIR, 'fleet.json')
+FLEET_FRAME_PORT = 9090  # Port display nodes listen on for frames from the hub
+FLEET_POLL_INTERVAL = 2  # Seconds between playback polls for a single account
+FLEET_MAX_REQUESTS_PER_SECOND = 2  # Shared Spotify API budget across all accounts
\ No newline at end of file
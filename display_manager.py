@@ -4,34 +4,58 @@ import socket
 import requests
 from PIL import Image, ImageDraw, ImageFont, JpegImagePlugin
 from io import BytesIO
-from rgbmatrix import RGBMatrix, RGBMatrixOptions
 from utils.logger import setup_logger
-from config import get_matrix_options, AUTH_SERVER_PORT
+from utils.art_cache import ArtCache, FRAME_SIZE, FRAME_BYTES
+from utils.frame_pool import FramePool
+from utils.frame_clock import FrameClock
+from utils.frame_pack import FramePackReader, FramePackWriter, FramePackError, compact
+from utils.art_pipeline import ArtPipeline
+from utils.resample import check_tier, draft, resize_frame
+from utils.resilience import CircuitBreaker
+from utils.matrix import create_matrix
+from config import get_matrix_options, AUTH_SERVER_PORT, CACHE_DIR, DISPLAY_OUTPUT, FRAME_BUFFER_PATH, RESIZE_TIER
 
 logger = setup_logger('display', 'display.log')
 
+class NullCanvas:
+    """Canvas that discards everything drawn on it, for headless runs"""
+    def SetImage(self, image, offset_x=0, offset_y=0):
+        pass
+
+    def Clear(self):
+        pass
+
+class NullMatrix:
+    """Stand-in for RGBMatrix with no panel attached, for headless runs"""
+    def CreateFrameCanvas(self):
+        return NullCanvas()
+
+    def SwapOnVSync(self, canvas):
+        return canvas
+
 class DisplayManager:
-    def __init__(self):
-        """Initialize the display manager"""
-        logger.info("Initializing DisplayManager")
+    def __init__(self, output=DISPLAY_OUTPUT, resize_tier=RESIZE_TIER):
+        """Initialize the display manager
+
+        output "matrix" drives the panel from this process. "shm" publishes
+        frames to the shared ring buffer read by spotify_matrix_driver.py,
+        so this process needs neither root nor the rgbmatrix bindings.
+        "null" draws everything but shows it nowhere, for headless testing.
+        resize_tier picks how album art is scaled (see utils/resample.py).
+        """
+        logger.info(f"Initializing DisplayManager (output={output}, resize={resize_tier})")
+        self.resize_tier = check_tier(resize_tier)
         try:
-            logger.debug("Creating RGBMatrixOptions")
-            options = RGBMatrixOptions()
-            matrix_options = get_matrix_options()
-            
-            # Set critical display options for reduced flickering
-            matrix_options['disable_hardware_pulsing'] = False  # Enable hardware pulsing
-            matrix_options['pwm_bits'] = 11  # Increase PWM bits for better color depth
-            matrix_options['pwm_lsb_nanoseconds'] = 130  # Adjust PWM timing
-            matrix_options['limit_refresh_rate_hz'] = 100  # Set refresh rate limit
-            
-            logger.debug(f"Setting matrix options: {matrix_options}")
-            for key, value in matrix_options.items():
-                logger.debug(f"Setting option {key} = {value}")
-                setattr(options, key, value)
-            
-            logger.debug("Creating RGBMatrix with options")
-            self.matrix = RGBMatrix(options=options)
+            if output == 'shm':
+                from utils.frame_buffer import SharedFrameMatrix
+                options = get_matrix_options()
+                self.matrix = SharedFrameMatrix(FRAME_BUFFER_PATH, options['cols'], options['rows'])
+            elif output == 'matrix':
+                self.matrix = create_matrix()
+            elif output == 'null':
+                self.matrix = NullMatrix()
+            else:
+                raise ValueError(f"Unknown display output: {output}")
             
             # Create offscreen canvas for double buffering
             self.offscreen_canvas = self.matrix.CreateFrameCanvas()
@@ -52,9 +76,29 @@ class DisplayManager:
             logger.error(f"Failed to initialize LED Matrix: {str(e)}", exc_info=True)
             raise
         
-        self.current_image = None
+        # Every full frame the display draws lives in this pool, so a
+        # long-running display never allocates per track or per animation
+        # frame. The blend target and fade mask are held for good.
+        self.frames = FramePool(FRAME_SIZE, count=5)
+        self._blend_frame = self.frames.acquire('fade blend')
+        self._fade_mask = Image.new('L', FRAME_SIZE)
+        
+        # Every animation is paced by this one clock
+        self.clock = FrameClock(self._swap, get_matrix_options().get('limit_refresh_rate_hz', 100))
+        
+        self.current_image = None  # Pooled frame owned by the display, None when blank
+        self.idle = False
+        self.first_frame_at = None  # time.monotonic() of the first swap, for startup timing
         self.current_art_url = None
         self.matrix_height = 64
+        
+        # Resized artwork survives restarts on disk, and the breaker stops us
+        # hammering the CDN while it (or our network) is down
+        self.art_cache = ArtCache()
+        self.art_breaker = CircuitBreaker('album art')
+        self.art_pipeline = None  # Worker processes for batches, started on first use
+        
+        self._frame_packs = {}  # Open FramePackReaders by name
     
     def _test_matrix(self):
         """Display a test pattern to verify the matrix is working"""
@@ -71,14 +115,14 @@ class DisplayManager:
             
             # Use double buffering for test pattern
             self.offscreen_canvas.SetImage(test_image)
-            self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+            self._swap()
             
             logger.info("Test pattern displayed successfully")
             time.sleep(5)  # Show test pattern for 5 seconds
             
             # Clear using double buffering
             self.offscreen_canvas.Clear()
-            self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+            self._swap()
             test_image.close()
             
         except Exception as e:
@@ -88,29 +132,33 @@ class DisplayManager:
         """Download album art from URL"""
         logger.debug(f"Downloading album art from: {url}")
         try:
-            response = requests.get(url)
-            response.raise_for_status()
-            
-            logger.debug("\nDEBUG INFO:")
-            logger.debug(f"URL: {url}")
-            logger.debug(f"Content-Type: {response.headers.get('content-type', 'unknown')}")
-            logger.debug(f"Content-Length: {len(response.content)} bytes")
-            
-            # Use context manager for BytesIO to ensure proper cleanup
-            with BytesIO(response.content) as image_data:
+            with requests.get(url, timeout=10) as response:
+                response.raise_for_status()
+                content = response.content
+                
+                logger.debug("\nDEBUG INFO:")
+                logger.debug(f"URL: {url}")
+                logger.debug(f"Content-Type: {response.headers.get('content-type', 'unknown')}")
+                logger.debug(f"Content-Length: {len(content)} bytes")
+            
+            # Decode straight from the response body. load() reads all pixel
+            # data, so no copy is needed once the BytesIO is closed.
+            with BytesIO(content) as image_data:
                 # Try to open with PIL
                 logger.debug("Attempting to open image with PIL")
                 try:
                     new_image = Image.open(image_data)
-                    # Create a copy of the image to avoid issues with the closed file
-                    logger.debug("Creating copy of image")
-                    new_image = new_image.copy()
+                    # The fast tier lets JPEGs decode at a fraction of full size
+                    draft(new_image, self.resize_tier, FRAME_SIZE)
+                    new_image.load()
                     logger.debug(f"Successfully opened image: format={new_image.format}, mode={new_image.mode}, size={new_image.size}")
                     
-                    # Convert to RGB if needed
+                    # Convert to RGB if needed, closing the original straight away
                     if new_image.mode != 'RGB':
                         logger.debug(f"Converting from {new_image.mode} to RGB")
-                        new_image = new_image.convert('RGB')
+                        converted = new_image.convert('RGB')
+                        new_image.close()
+                        new_image = converted
                     
                     logger.debug("Successfully downloaded and processed image")
                     return new_image
@@ -128,9 +176,8 @@ class DisplayManager:
     def resize_image(self, image):
         """Resize image to fit matrix dimensions"""
         try:
-            logger.debug(f"Resizing image from {image.size} to (64, 64)")
-            # Resize the image with high-quality resampling
-            display_image = image.resize((64, 64), Image.Resampling.LANCZOS)
+            logger.debug(f"Resizing image from {image.size} to (64, 64) ({self.resize_tier})")
+            display_image = resize_frame(image, self.resize_tier, FRAME_SIZE)
             logger.debug(f"Successfully resized to {display_image.size}")
             return display_image
             
@@ -138,100 +185,147 @@ class DisplayManager:
             logger.error(f"Error resizing image: {e}", exc_info=True)
             return None
 
-    def _animate_fade(self, new_image, steps=30):
+    def _swap(self):
+        """Swap the offscreen canvas onto the panel at the next vsync"""
+        self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+        if self.first_frame_at is None:
+            self.first_frame_at = time.monotonic()
+
+    def _animate_fade(self, new_image, steps=30, fps=60):
         """Animate fade transition between current and new image"""
         try:
             logger.debug("Starting fade transition")
+            frame = self._blend_frame
             
-            # Calculate frame timing for smooth animation
-            frame_time = 0.016  # Target 60fps (1/60 ≈ 0.016s)
-            last_frame_time = time.time()
-            
-            # Generate and display each frame
-            for i in range(steps + 1):
+            def render(i):
+                # Blend in place: start from the current image (or black) and
+                # paste the new image through a uniform alpha mask
                 alpha = i / steps
-                
                 if self.current_image:
-                    # Blend between current and new image
-                    frame = Image.blend(self.current_image, new_image, alpha)
+                    frame.paste(self.current_image)
                 else:
-                    # If no current image, fade in from black
-                    frame = Image.new('RGB', (64, 64), color='black')
-                    frame = Image.blend(frame, new_image, alpha)
-                
-                # Timing control for smooth animation
-                current_time = time.time()
-                sleep_time = max(0, frame_time - (current_time - last_frame_time))
-                if sleep_time > 0:
-                    time.sleep(sleep_time)
-                
-                # Display frame using double buffering
+                    frame.paste((0, 0, 0), (0, 0) + FRAME_SIZE)
+                self._fade_mask.paste(int(round(alpha * 255)), (0, 0) + FRAME_SIZE)
+                frame.paste(new_image, (0, 0), self._fade_mask)
                 self.offscreen_canvas.SetImage(frame)
-                self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
-                
-                last_frame_time = time.time()
-                
-                # Clean up the intermediate frame
-                if i < steps:  # Don't close the final frame
-                    frame.close()
             
-            logger.debug("Fade transition completed")
+            # The clock paces the frames and swaps them in on their deadlines
+            stats = self.clock.play(steps + 1, fps, render)
+            
+            logger.debug(f"Fade transition completed: {stats.summary()}")
             
         except Exception as e:
             logger.error(f"Error during fade transition: {e}", exc_info=True)
             # Ensure the new image is displayed even if animation fails
             self.offscreen_canvas.SetImage(new_image)
-            self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+            self._swap()
 
     def display_image(self, image):
-        """Display image on LED matrix with fade transition"""
+        """Display image on LED matrix with fade transition
+
+        The image is copied into a pooled frame, so the caller keeps
+        ownership of it and is responsible for closing or releasing it.
+        """
+        frame = None
         try:
             logger.debug("Preparing to display image")
             
-            # Ensure image is in correct format
-            if image.mode != 'RGB':
-                image = image.convert('RGB')
+            # Copy into a pooled frame (paste converts the mode if needed)
+            frame = self.frames.acquire('current image')
+            frame.paste(image)
             
             # Animate fade transition to new image
-            self._animate_fade(image)
+            self._animate_fade(frame)
             
-            # Store the current image
+            # The new frame replaces the current one
             if self.current_image:
-                self.current_image.close()
-            self.current_image = image
+                self.frames.release(self.current_image)
+            self.current_image = frame
             
             logger.info("Successfully displayed image on matrix")
             return True
             
         except Exception as e:
             logger.error(f"Error displaying image: {e}", exc_info=True)
+            if frame is not None:
+                self.frames.release(frame)
             return False
     
+    def load_album_art(self, album_art_url):
+        """Get resized album art from the cache, downloading it if needed
+
+        Returns a pooled frame that the caller must release, or None.
+        """
+        data = self.art_cache.get(album_art_url)
+        if data is not None:
+            logger.debug("Using cached album art")
+            frame = self.frames.acquire('album art')
+            frame.frombytes(data)
+            return frame
+        
+        if not self.art_breaker.allow():
+            logger.warning(f"Album art downloads paused, retrying in {self.art_breaker.retry_in():.0f}s")
+            return None
+        
+        image = self.download_album_art(album_art_url)
+        if not image:
+            logger.error("Failed to download album art")
+            self.art_breaker.record_failure()
+            return None
+        self.art_breaker.record_success()
+        
+        logger.debug("Successfully downloaded image, resizing...")
+        resized_image = self.resize_image(image)
+        # Clean up the original image as it's no longer needed
+        image.close()
+        
+        if not resized_image:
+            logger.error("Failed to resize image")
+            return None
+        
+        self.art_cache.put(album_art_url, resized_image.tobytes())
+        frame = self.frames.acquire('album art')
+        frame.paste(resized_image)
+        resized_image.close()
+        return frame
+    
+    def process_album_art(self, items, skip_cached=True):
+        """Download, decode and resize many covers in parallel into the art cache
+
+        items are URLs or (url, image bytes) pairs. Yields (url, frame bytes)
+        as each one completes, with None for failures. Work is spread over
+        one worker process per CPU core; single covers for the current track
+        still go through load_album_art on this thread.
+        """
+        if self.art_pipeline is None:
+            self.art_pipeline = ArtPipeline(self.art_cache, tier=self.resize_tier)
+        return self.art_pipeline.process(items, skip_cached)
+
+    def close_art_pipeline(self):
+        """Stop the batch worker processes if they are running"""
+        if self.art_pipeline is not None:
+            self.art_pipeline.close()
+            self.art_pipeline = None
+
     def update_display(self, album_art_url):
-        """Update display with new album art"""
+        """Update display with new album art
+
+        If the art can't be fetched the current frame stays on the panel.
+        """
         try:
             if album_art_url != self.current_art_url:
                 logger.info(f"New album art URL detected: {album_art_url}")
-                image = self.download_album_art(album_art_url)
-                if image:
-                    logger.debug("Successfully downloaded image, resizing...")
-                    resized_image = self.resize_image(image)
-                    # Clean up the original image as it's no longer needed
-                    image.close()
-                    
-                    if resized_image:
-                        logger.debug("Successfully resized image, displaying...")
-                        if self.display_image(resized_image):
-                            self.current_art_url = album_art_url
-                            logger.info("Successfully updated display with new album art")
-                            return True
-                        else:
-                            logger.error("Failed to display resized image")
-                            resized_image.close()
+                album_art = self.load_album_art(album_art_url)
+                if album_art:
+                    logger.debug("Successfully loaded image, displaying...")
+                    displayed = self.display_image(album_art)
+                    self.frames.release(album_art)
+                    if displayed:
+                        self.current_art_url = album_art_url
+                        logger.info("Successfully updated display with new album art")
+                        return True
                     else:
-                        logger.error("Failed to resize image")
-                else:
-                    logger.error("Failed to download album art")
+                        logger.error("Failed to display resized image")
             else:
                 logger.debug("Album art URL unchanged, skipping update")
             return False
@@ -244,9 +338,9 @@ class DisplayManager:
         try:
             logger.debug("Clearing LED matrix display")
             self.offscreen_canvas.Clear()
-            self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+            self._swap()
             if self.current_image:
-                self.current_image.close()
+                self.frames.release(self.current_image)
             self.current_image = None
             self.current_art_url = None
             logger.info("Successfully cleared display")
@@ -255,13 +349,59 @@ class DisplayManager:
             logger.error(f"Error clearing display: {e}")
             return False
             
+    def restore_frame(self, data, album_art_url=None):
+        """Put a saved raw frame straight back on the panel, with no fade
+
+        Used on restart, so the art that was showing is back up before the
+        network or Spotify have even been checked.
+        """
+        if len(data) != FRAME_BYTES:
+            logger.warning(f"Not restoring a {len(data)} byte frame")
+            return False
+        try:
+            frame = self.frames.acquire('current image')
+            frame.frombytes(data)
+            self.offscreen_canvas.SetImage(frame)
+            self._swap()
+            if self.current_image:
+                self.frames.release(self.current_image)
+            self.current_image = frame
+            self.current_art_url = album_art_url
+            return True
+        except Exception as e:
+            logger.error(f"Error restoring frame: {e}")
+            return False
+
+    def set_idle(self, idle):
+        """Blank the panel and let it sleep while nothing is playing, or wake it
+
+        The rgbmatrix refresh thread can't be slowed once running, so
+        in-process output drops brightness to zero. With "shm" output the
+        driver process is told to pause as well.
+        """
+        if idle == self.idle:
+            return
+        self.idle = idle
+        try:
+            if idle:
+                self.clear_display()
+            if hasattr(self.matrix, 'set_idle'):
+                self.matrix.set_idle(idle)
+            elif hasattr(self.matrix, 'brightness'):
+                self.matrix.brightness = 0 if idle else get_matrix_options()['brightness']
+            logger.info(f"Display {'idle' if idle else 'awake'}")
+        except Exception as e:
+            logger.error(f"Error changing idle state: {e}")
+
     def __del__(self):
         """Cleanup when the object is destroyed"""
-        if self.current_image:
-            try:
-                self.current_image.close()
-            except:
-                pass
+        try:
+            for reader in self._frame_packs.values():
+                reader.close()
+            self.frames.close()
+            self._fade_mask.close()
+        except:
+            pass
 
     def get_local_ip(self):
         """Get the local IP address"""
@@ -276,11 +416,19 @@ class DisplayManager:
             logger.error(f"Error getting local IP: {e}")
             return None
 
-    def create_text_image(self, text, large=False, color=(255, 255, 255)):
-        """Create an image with centered text, handling multiple lines with 3D effect"""
+    def create_text_image(self, text, large=False, color=(255, 255, 255), into=None):
+        """Create an image with centered text, handling multiple lines with 3D effect
+
+        Pass a frame as `into` to draw onto it in place instead of allocating.
+        """
         try:
-            # Create a new image with black background
-            image = Image.new('RGB', (64, 64), color='black')
+            if into is not None:
+                # Reuse the caller's frame, blanked to a black background
+                image = into
+                image.paste((0, 0, 0), (0, 0) + image.size)
+            else:
+                # Create a new image with black background
+                image = Image.new('RGB', (64, 64), color='black')
             draw = ImageDraw.Draw(image)
             
             # Use large font for main messages, regular for IP/status
@@ -347,14 +495,22 @@ class DisplayManager:
             return None
 
     def display_text(self, text, duration=None, large=False, color=(255, 255, 255)):
-        """Display text on the LED matrix"""
+        """Display text on the LED matrix
+
+        duration counts from when the text starts fading in, so the fade
+        doesn't make every message run long.
+        """
         try:
             logger.debug(f"Displaying text: {text}")
-            text_image = self.create_text_image(text, large, color)
-            if text_image:
-                self.display_image(text_image)
-                if duration:
-                    time.sleep(duration)
+            shown_at = self.clock.now()
+            frame = self.frames.acquire('text')
+            try:
+                if self.create_text_image(text, large, color, into=frame):
+                    self.display_image(frame)
+            finally:
+                self.frames.release(frame)
+            if duration:
+                self.clock.hold(duration, since=shown_at)
             return True
         except Exception as e:
             logger.error(f"Error displaying text: {e}")
@@ -398,22 +554,110 @@ class DisplayManager:
             colors.append(rgb)
         return colors
 
+    def frame_pack_path(self, name):
+        """Get the location of a named frame pack in the cache directory"""
+        return os.path.join(CACHE_DIR, f"{name}.pack")
+
+    def open_frame_pack(self, name):
+        """Open (and keep open) a named frame pack, or return None if unusable
+
+        Packs are integrity checked when first opened; corrupt frames are
+        compacted away so they get regenerated.
+        """
+        reader = self._frame_packs.get(name)
+        if reader:
+            return reader
+        
+        path = self.frame_pack_path(name)
+        if not os.path.exists(path):
+            return None
+        try:
+            reader = FramePackReader(path)
+            bad = reader.verify()
+            if bad:
+                logger.warning(f"Frame pack {name} has {len(bad)} corrupt frames, compacting")
+                reader.close()
+                compact(path)
+                reader = FramePackReader(path)
+        except FramePackError as e:
+            logger.error(f"Discarding unreadable frame pack {name}: {e}")
+            os.remove(path)
+            return None
+        
+        self._frame_packs[name] = reader
+        return reader
+
+    def write_frame_pack(self, name, frames):
+        """Append (key, frame) pairs to a named frame pack"""
+        self.close_frame_pack(name)  # Reopen afterwards to see the new index
+        try:
+            with FramePackWriter(self.frame_pack_path(name), *FRAME_SIZE) as writer:
+                for key, frame in frames:
+                    writer.add(key, frame)
+            return True
+        except (FramePackError, OSError) as e:
+            logger.error(f"Error writing frame pack {name}: {e}")
+            return False
+
+    def compact_frame_pack(self, name):
+        """Reclaim space from superseded frames in a named frame pack"""
+        self.close_frame_pack(name)
+        return compact(self.frame_pack_path(name))
+
+    def close_frame_pack(self, name):
+        """Unmap a named frame pack if it is open"""
+        reader = self._frame_packs.pop(name, None)
+        if reader:
+            reader.close()
+
+    def _set_frame(self, frame):
+        """Put a raw (h, w, 3) frame on the offscreen canvas"""
+        self._blend_frame.frombytes(frame)
+        self.offscreen_canvas.SetImage(self._blend_frame)
+
+    def show_frame(self, frame):
+        """Show a raw (h, w, 3) frame, e.g. a view from a frame pack, without a transition"""
+        self._set_frame(frame)
+        self._swap()
+
+    def _rainbow_frames(self, text, steps):
+        """Get the rainbow animation frames for text, rendering them only once
+
+        Frames are kept in the "startup" pack, so later boots skip font
+        rendering entirely and read them straight out of the mapped file.
+        """
+        font_name = getattr(self.large_font, 'path', 'default')
+        keys = [f"rainbow/{font_name}/{steps}/{text}/{i:03d}" for i in range(steps)]
+        
+        pack = self.open_frame_pack('startup')
+        if pack is None or any(key not in pack for key in keys):
+            logger.info("Rendering rainbow frames into the startup pack")
+            frame = self.frames.acquire('rainbow render')
+            try:
+                rendered = []
+                for key, color in zip(keys, self._create_rainbow_colors(steps)):
+                    if not self.create_text_image(text, large=True, color=color, into=frame):
+                        return None
+                    rendered.append((key, frame.tobytes()))
+            finally:
+                self.frames.release(frame)
+            if not self.write_frame_pack('startup', rendered):
+                return [data for _, data in rendered]
+            pack = self.open_frame_pack('startup')
+            if pack is None:
+                return [data for _, data in rendered]
+        
+        return [pack.frame(key) for key in keys]
+
     def _animate_rainbow_text(self, text, duration=3, steps=60):
         """Display text with rainbow animation"""
         try:
-            colors = self._create_rainbow_colors(steps)
-            start_time = time.time()
-            frame_time = duration / steps
-            
-            while time.time() - start_time < duration:
-                for color in colors:
-                    text_image = self.create_text_image(text, large=True, color=color)
-                    if text_image:
-                        self.offscreen_canvas.SetImage(text_image)
-                        self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
-                        text_image.close()
-                        time.sleep(frame_time)
+            frames = self._rainbow_frames(text, steps)
+            if not frames:
+                return False
             
+            # One pass through the colours, spread evenly over the duration
+            self.clock.play(len(frames), steps / duration, lambda i: self._set_frame(frames[i]))
             return True
         except Exception as e:
             logger.error(f"Error in rainbow animation: {e}")
@@ -0,0 +1,87 @@
+#!/usr/bin/env python3
+import os
+import sys
+import signal
+import argparse
+import threading
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger('node', 'node.log')
+
+from utils.art_cache import FRAME_SIZE, FRAME_BYTES
+from utils.frame_link import FrameServer
+from config import CACHE_DIR, FLEET_FRAME_PORT
+
+class DisplayNode:
+    def __init__(self, port=FLEET_FRAME_PORT, headless=False):
+        """Thin display that shows whatever frames the fleet hub sends it
+
+        With headless=True no matrix is driven: frames are logged and the
+        latest one is written to the cache directory, which makes a local
+        stand-in for testing the hub without hardware.
+        """
+        logger.info(f"Initializing DisplayNode (headless={headless})")
+        self.headless = headless
+        self.display = None
+        self.frames_received = 0
+        self._lock = threading.Lock()  # The hub may reconnect while a frame is still drawing
+
+        if not headless:
+            from display_manager import DisplayManager
+            self.display = DisplayManager()
+
+        self.server = FrameServer(port, self.on_frame, self.on_clear)
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+    def handle_signal(self, signum, frame):
+        """Handle termination signals"""
+        logger.info(f"Received signal {signum}")
+        threading.Thread(target=self.server.shutdown, daemon=True).start()
+
+    def on_frame(self, data):
+        """Show a raw RGB frame from the hub"""
+        if len(data) != FRAME_BYTES:
+            logger.error(f"Ignoring frame of {len(data)} bytes, expected {FRAME_BYTES}")
+            return
+
+        with self._lock:
+            self.frames_received += 1
+            image = Image.frombytes('RGB', FRAME_SIZE, data)
+            if self.headless:
+                logger.info(f"Received frame #{self.frames_received}")
+                image.save(os.path.join(CACHE_DIR, 'node_last_frame.png'))
+            else:
+                self.display.display_image(image)
+            image.close()
+
+    def on_clear(self):
+        """Blank the display"""
+        with self._lock:
+            logger.info("Received clear")
+            if not self.headless:
+                self.display.clear_display()
+
+    def run(self):
+        """Serve frames until stopped"""
+        host, port = self.server.server_address
+        logger.info(f"Listening for frames on {host}:{port}")
+        self.server.serve_forever()
+        self.server.server_close()
+        if not self.headless:
+            self.display.clear_display()
+        logger.info("Display node stopped")
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="SpotifyMatrix display node")
+    parser.add_argument('--port', type=int, default=FLEET_FRAME_PORT)
+    parser.add_argument('--headless', action='store_true', help="Log frames instead of driving the matrix")
+    args = parser.parse_args()
+
+    try:
+        node = DisplayNode(port=args.port, headless=args.headless)
+        node.run()
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        sys.exit(1)
@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+import os
+import sys
+import json
+import time
+import signal
+from utils.logger import setup_logger
+
+logger = setup_logger('fleet', 'fleet.log')
+
+from spotify_client import SpotifyClient
+from utils.art_cache import ArtCache
+from utils.art_pipeline import ArtPipeline
+from utils.frame_link import FrameSender, parse_address
+from utils.poll_scheduler import PollScheduler
+from utils.network import wait_for_network
+from config import (
+    BASE_DIR,
+    FLEET_CONFIG_FILE,
+    FLEET_FRAME_PORT,
+    FLEET_POLL_INTERVAL,
+    FLEET_MAX_REQUESTS_PER_SECOND
+)
+
+def load_fleet_config(path=FLEET_CONFIG_FILE):
+    """Load the account/node list
+
+    The file looks like:
+        {"accounts": [{"name": "kitchen", "nodes": ["192.168.1.20", "192.168.1.21:9090"]}]}
+    Each account reads its token from .cache-<name> unless cache_path is given.
+    """
+    with open(path) as f:
+        config = json.load(f)
+    accounts = config.get('accounts', [])
+    if not accounts:
+        raise ValueError(f"No accounts configured in {path}")
+    return accounts
+
+class FleetAccount:
+    def __init__(self, name, cache_path, nodes):
+        """One Spotify account and the display nodes showing it"""
+        self.name = name
+        self.client = SpotifyClient(cache_path=cache_path)
+        self.nodes = [FrameSender(parse_address(node, FLEET_FRAME_PORT)) for node in nodes]
+        self.art_url = None  # What the nodes are currently showing, None when blank
+        self.cleared = False
+        self.pending_url = None  # Art being processed for this account
+        self.pending = None  # Future for pending_url's frame
+
+class FleetHub:
+    def __init__(self, config_path=FLEET_CONFIG_FILE):
+        """Poll many accounts from one process and push frames to their nodes"""
+        logger.info("Initializing FleetHub")
+        self.running = True
+        self.art_cache = ArtCache()
+        # Art is decoded on worker processes so one slow download or decode
+        # never holds up polling the other accounts
+        self.art_pipeline = ArtPipeline(self.art_cache)
+        self.scheduler = PollScheduler(
+            min_interval=FLEET_POLL_INTERVAL,
+            max_requests_per_second=FLEET_MAX_REQUESTS_PER_SECOND
+        )
+        self.accounts = {}
+
+        for entry in load_fleet_config(config_path):
+            name = entry['name']
+            cache_path = entry.get('cache_path') or os.path.join(BASE_DIR, f'.cache-{name}')
+            self.accounts[name] = FleetAccount(name, cache_path, entry.get('nodes', []))
+            self.scheduler.add(name)
+            logger.info(f"Account {name}: {len(self.accounts[name].nodes)} node(s), token cache {cache_path}")
+
+        logger.info(f"Polling {len(self.accounts)} account(s) every {self.scheduler.interval():.1f}s each")
+
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+    def handle_signal(self, signum, frame):
+        """Handle termination signals"""
+        logger.info(f"Received signal {signum}")
+        self.running = False
+
+    def _sleep(self, seconds):
+        """Sleep in short slices so signals stop the hub promptly and art is sent as it finishes"""
+        end = time.monotonic() + seconds
+        while self.running and time.monotonic() < end:
+            self.deliver_art()
+            time.sleep(min(0.25, max(0, end - time.monotonic())))
+
+    def _show(self, account, url, data):
+        """Send a frame to every node of an account"""
+        for node in account.nodes:
+            node.send_frame(data)
+        account.art_url = url
+        account.cleared = False
+
+    def deliver_art(self):
+        """Send art that finished processing to the nodes waiting for it"""
+        for account in self.accounts.values():
+            future = account.pending
+            if future is None or not future.done():
+                continue
+            account.pending = None
+            url, account.pending_url = account.pending_url, None
+            if future.exception() is None:
+                self._show(account, url, future.result())
+
+    def poll_account(self, account):
+        """Poll one account and update its nodes if the artwork changed"""
+        current_track = account.client.get_current_track()
+
+        if not current_track:
+            if not account.cleared:
+                logger.info(f"[{account.name}] No track playing, clearing nodes")
+                for node in account.nodes:
+                    node.send_clear()
+                account.art_url = None
+                account.cleared = True
+                account.pending = account.pending_url = None
+            else:
+                for node in account.nodes:
+                    node.resend()
+            return
+
+        url = current_track.album_art_url
+        if not url or url in (account.art_url, account.pending_url):
+            # Nothing new to show, but retry nodes that were unreachable
+            for node in account.nodes:
+                node.resend()
+            return
+
+        logger.info(f"[{account.name}] New track: {current_track.name} by {current_track.artist}")
+        data = self.art_cache.get(url)
+        if data is not None:
+            account.pending = account.pending_url = None
+            self._show(account, url, data)
+            return
+
+        # Shown by deliver_art once a worker has it ready
+        account.pending_url = url
+        account.pending = self.art_pipeline.submit(url)
+
+    def run(self):
+        """Main hub loop"""
+        logger.info("Starting fleet hub")
+
+        if not wait_for_network():
+            logger.warning("No network yet, will keep retrying in the main loop")
+
+        while self.running:
+            name, delay = self.scheduler.next()
+            self._sleep(delay)
+            if not self.running:
+                break
+            # _sleep only delivers while it waits, and a scheduler running
+            # behind never waits at all
+            self.deliver_art()
+
+            account = self.accounts[name]
+            try:
+                self.poll_account(account)
+            except Exception as e:
+                logger.error(f"[{name}] Error polling account: {e}", exc_info=True)
+            self.scheduler.complete(name, retry_after=account.client.retry_after)
+
+        self.art_pipeline.close()
+        for account in self.accounts.values():
+            for node in account.nodes:
+                node.close()
+        logger.info(f"Fleet hub stopped ({self.art_pipeline.completed} art images processed, {self.art_cache.hits} cache hits)")
+
+if __name__ == "__main__":
+    try:
+        config_path = sys.argv[1] if len(sys.argv) > 1 else FLEET_CONFIG_FILE
+        hub = FleetHub(config_path)
+        hub.run()
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        sys.exit(1)
@@ -1,5 +1,7 @@
-from flask import Flask, redirect, request
+from flask import Flask, Response, redirect, request
 import os
+import sys
+import threading
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 import netifaces
@@ -7,7 +9,10 @@ from config import (
     SPOTIFY_CLIENT_ID,
     SPOTIFY_CLIENT_SECRET,
     SPOTIFY_REDIRECT_URI,
-    AUTH_SERVER_PORT
+    SPOTIFY_SCOPE,
+    SPOTIFY_LIBRARY_SCOPE,
+    AUTH_SERVER_PORT,
+    AUTH_SERVER_THREADS
 )
 from utils.logger import setup_logger
 
@@ -19,6 +24,125 @@ os.environ['SPOTIPY_CLIENT_ID'] = SPOTIFY_CLIENT_ID
 os.environ['SPOTIPY_CLIENT_SECRET'] = SPOTIFY_CLIENT_SECRET
 os.environ['SPOTIPY_REDIRECT_URI'] = SPOTIFY_REDIRECT_URI
 
+# One token manager for the life of the server instead of one per request.
+# New connections also grant library access for cache warmup.
+auth_manager = SpotifyOAuth(
+    scope=f'{SPOTIFY_SCOPE} {SPOTIFY_LIBRARY_SCOPE}',
+    open_browser=False,
+    show_dialog=True  # Always show dialog for account selection
+)
+
+STATUS_PAGE = '''
+    <html>
+    <head>
+        <style>
+            body { font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }
+            h1 { color: #1DB954; }
+            .button { display: inline-block; background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; border: none; font-size: 16px; cursor: pointer; margin: 10px; }
+            .warning { color: #e55; margin: 20px 0; }
+        </style>
+    </head>
+    <body>
+        <h1>SpotifyMatrix Status</h1>
+        <p>A Spotify account is currently connected and displaying music.</p>
+        <p>Want to switch to a different account?</p>
+        <form action="/reauth" method="post">
+            <button type="submit" class="button">Switch Spotify Account</button>
+        </form>
+        <p class="warning">Note: This will disconnect the current account.</p>
+    </body>
+    </html>
+'''
+
+CONNECT_PAGE = '''
+    <html>
+    <head>
+        <style>
+            body {{ font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }}
+            h1 {{ color: #1DB954; }}
+            .button {{ display: inline-block; background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; margin: 20px; }}
+        </style>
+    </head>
+    <body>
+        <h1>Welcome to SpotifyMatrix!</h1>
+        <p>Click the button below to connect your Spotify account:</p>
+        <a href="{auth_url}" class="button">Connect Spotify</a>
+    </body>
+    </html>
+'''
+
+SETUP_COMPLETE_PAGE = '''
+    <html>
+    <head>
+        <style>
+            body { font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }
+            h1 { color: #1DB954; }
+        </style>
+    </head>
+    <body>
+        <h1>Setup Complete! ✓</h1>
+        <p>Your SpotifyMatrix has been authenticated.</p>
+        <p>You can now close this window and enjoy your music visualization!</p>
+        <p>To switch accounts later, just visit this page again.</p>
+        <script>
+            setTimeout(function() {
+                window.close();
+            }, 5000);
+        </script>
+    </body>
+    </html>
+'''
+
+class PageCache:
+    def __init__(self):
+        """Pre-rendered index page, rebuilt only when the token cache changes
+
+        The page only depends on whether a token exists, so it is keyed on
+        the token file's mtime. That also catches the display service
+        refreshing the token, with no network call on the request path.
+        """
+        self._lock = threading.Lock()
+        self._key = None
+        self._page = None
+        self._connect_page = None
+
+    def _token_key(self):
+        """Get a key that changes whenever the token cache file does"""
+        try:
+            return os.stat(auth_manager.cache_handler.cache_path).st_mtime_ns
+        except (FileNotFoundError, AttributeError):
+            return None
+
+    def _render(self, key):
+        """Render the index page for the current token state"""
+        token_info = auth_manager.cache_handler.get_cached_token() if key else None
+        # A refresh token is all the display needs; it refreshes on its own
+        if token_info and token_info.get('refresh_token'):
+            logger.info("Valid token found, caching status page")
+            return STATUS_PAGE.encode('utf-8')
+
+        if self._connect_page is None:
+            # The authorize URL only depends on our static OAuth settings
+            self._connect_page = CONNECT_PAGE.format(auth_url=auth_manager.get_authorize_url()).encode('utf-8')
+        logger.info("No token found, caching connect page")
+        return self._connect_page
+
+    def get(self):
+        """Get the index page, re-rendering it if the token changed"""
+        key = self._token_key()
+        with self._lock:
+            if self._page is None or key != self._key:
+                self._page = self._render(key)
+                self._key = key
+            return self._page
+
+    def invalidate(self):
+        """Force the next request to re-render"""
+        with self._lock:
+            self._page = None
+
+page_cache = PageCache()
+
 def get_local_ip():
     # Get IP address of the Pi on the local network
     interfaces = netifaces.interfaces()
@@ -36,10 +160,11 @@ def clear_auth():
     """Clear the Spotify authentication"""
     try:
         # Remove the cache file
-        cache_file = '.cache'
+        cache_file = auth_manager.cache_handler.cache_path
         if os.path.exists(cache_file):
             os.remove(cache_file)
             logger.info("Auth cache cleared")
+        page_cache.invalidate()
         return True
     except Exception as e:
         logger.error(f"Error clearing auth: {e}")
@@ -47,57 +172,8 @@ def clear_auth():
 
 @app.route('/')
 def index():
-    logger.info("Index page accessed")
-    auth_manager = SpotifyOAuth(
-        scope='user-read-playback-state user-modify-playback-state',
-        open_browser=False,
-        show_dialog=True  # Always show dialog for account selection
-    )
-    
-    try:
-        if auth_manager.validate_token(auth_manager.get_cached_token()):
-            logger.info("Valid token found, showing status page")
-            return f'''
-                <html>
-                <head>
-                    <style>
-                        body {{ font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }}
-                        h1 {{ color: #1DB954; }}
-                        .button {{ display: inline-block; background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; border: none; font-size: 16px; cursor: pointer; margin: 10px; }}
-                        .warning {{ color: #e55; margin: 20px 0; }}
-                    </style>
-                </head>
-                <body>
-                    <h1>SpotifyMatrix Status</h1>
-                    <p>A Spotify account is currently connected and displaying music.</p>
-                    <p>Want to switch to a different account?</p>
-                    <form action="/reauth" method="post">
-                        <button type="submit" class="button">Switch Spotify Account</button>
-                    </form>
-                    <p class="warning">Note: This will disconnect the current account.</p>
-                </body>
-                </html>
-            '''
-    except:
-        pass
-    
-    auth_url = auth_manager.get_authorize_url()
-    return f'''
-        <html>
-        <head>
-            <style>
-                body {{ font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }}
-                h1 {{ color: #1DB954; }}
-                .button {{ display: inline-block; background-color: #1DB954; color: white; padding: 10px 20px; text-decoration: none; border-radius: 4px; margin: 20px; }}
-            </style>
-        </head>
-        <body>
-            <h1>Welcome to SpotifyMatrix!</h1>
-            <p>Click the button below to connect your Spotify account:</p>
-            <a href="{auth_url}" class="button">Connect Spotify</a>
-        </body>
-        </html>
-    '''
+    logger.debug("Index page accessed")
+    return Response(page_cache.get(), mimetype='text/html')
 
 @app.route('/reauth', methods=['POST'])
 def reauth():
@@ -110,41 +186,33 @@ def reauth():
 def callback():
     logger.info("Callback received from Spotify")
     code = request.args.get('code')
-    auth_manager = SpotifyOAuth(
-        scope='user-read-playback-state user-modify-playback-state',
-        open_browser=False,
-        show_dialog=True  # Always show dialog for account selection
-    )
     
     try:
         # Get tokens from Spotify (spotipy will handle caching)
-        auth_manager.get_access_token(code)
+        auth_manager.get_access_token(code, check_cache=False)
         logger.info("Successfully obtained access token")
     except Exception as e:
         logger.error(f"Error getting access token: {e}")
         return "Failed to authenticate with Spotify", 500
+    finally:
+        page_cache.invalidate()
     
-    return '''
-        <html>
-        <head>
-            <style>
-                body { font-family: Arial, sans-serif; max-width: 600px; margin: 40px auto; padding: 0 20px; text-align: center; }
-                h1 { color: #1DB954; }
-            </style>
-        </head>
-        <body>
-            <h1>Setup Complete! ✓</h1>
-            <p>Your SpotifyMatrix has been authenticated.</p>
-            <p>You can now close this window and enjoy your music visualization!</p>
-            <p>To switch accounts later, just visit this page again.</p>
-            <script>
-                setTimeout(function() {
-                    window.close();
-                }, 5000);
-            </script>
-        </body>
-        </html>
-    '''
+    return Response(SETUP_COMPLETE_PAGE, mimetype='text/html')
+
+def serve_production(host='0.0.0.0', port=AUTH_SERVER_PORT, threads=AUTH_SERVER_THREADS):
+    """Serve the app with a production WSGI server
+
+    Uses waitress when it is installed, otherwise werkzeug's threaded server
+    without the debugger and reloader.
+    """
+    try:
+        from waitress import serve
+    except ImportError:
+        logger.warning("waitress not installed, using werkzeug's threaded server")
+        from werkzeug.serving import make_server
+        make_server(host, port, app, threaded=True).serve_forever()
+        return
+    serve(app, host=host, port=port, threads=threads)
 
 if __name__ == '__main__':
     ip_address = get_local_ip()
@@ -154,4 +222,7 @@ if __name__ == '__main__':
     print(f"To authenticate Spotify, visit:")
     print(f"http://{ip_address}:{AUTH_SERVER_PORT}")
     print("="*50 + "\n")
-    app.run(host='0.0.0.0', port=AUTH_SERVER_PORT) 
\ No newline at end of file
+    if '--production' in sys.argv:
+        serve_production()
+    else:
+        app.run(host='0.0.0.0', port=AUTH_SERVER_PORT, threaded=True)
\ No newline at end of file
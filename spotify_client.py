@@ -1,42 +1,98 @@
 import os
+import time
 import logging
+import requests
 import spotipy
 from spotipy.oauth2 import SpotifyOAuth
 from utils.logger import setup_logger
 from config import (
     SPOTIFY_CLIENT_ID,
     SPOTIFY_CLIENT_SECRET,
-    SPOTIFY_REDIRECT_URI
+    SPOTIFY_REDIRECT_URI,
+    SPOTIFY_SCOPE
 )
 
 logger = setup_logger('spotify', 'spotify.log', level=logging.INFO)
 
+PLAYER_URL = 'https://api.spotify.com/v1/me/player'
+POLL_STATS_INTERVAL = 3600  # Seconds between poll cost reports
+
+class PlaybackState:
+    """The few playback fields the display needs, without the nested API dicts"""
+    __slots__ = ('item_id', 'name', 'artist', 'album_art_url', 'progress_ms', 'is_playing')
+
+    def __init__(self, item_id, name, artist, album_art_url, progress_ms, is_playing):
+        self.item_id = item_id
+        self.name = name
+        self.artist = artist
+        self.album_art_url = album_art_url
+        self.progress_ms = progress_ms
+        self.is_playing = is_playing
+
+    @classmethod
+    def from_api(cls, current):
+        """Build a record from a /me/player response, or None if nothing is loaded"""
+        item = current.get('item') if current else None
+        if not item:
+            return None
+        artists = item.get('artists') or [{}]
+        images = (item.get('album') or {}).get('images') or []
+        return cls(
+            item_id=item.get('id') or item.get('uri'),  # Local files have no id
+            name=item.get('name'),
+            artist=artists[0].get('name'),
+            album_art_url=images[0]['url'] if images else None,
+            progress_ms=current.get('progress_ms'),
+            is_playing=current.get('is_playing', False)
+        )
+
 class SpotifyClient:
-    def __init__(self):
-        """Initialize the Spotify client"""
+    def __init__(self, cache_path=None, scope=SPOTIFY_SCOPE):
+        """Initialize the Spotify client
+
+        cache_path selects the token cache file, so several accounts can be
+        served from one process. None keeps spotipy's default .cache location.
+        A cached token that lacks any of the requested scopes is ignored.
+        """
         logger.info("Initializing SpotifyClient")
         self.client = None
+        self.token_info = None
+        self.retry_after = None  # Seconds Spotify asked us to back off after a 429
+        
+        # Playback polling bypasses spotipy so it can revalidate with ETags
+        # over one kept-alive connection
+        self.session = requests.Session()
+        self._etag = None
+        self._playback = None
+        self._reset_poll_stats()
         
         # Set environment variables for Spotipy
         os.environ['SPOTIPY_CLIENT_ID'] = SPOTIFY_CLIENT_ID
         os.environ['SPOTIPY_CLIENT_SECRET'] = SPOTIFY_CLIENT_SECRET
         os.environ['SPOTIPY_REDIRECT_URI'] = SPOTIFY_REDIRECT_URI
         
-        # Use spotipy's default .cache location
+        # Use spotipy's default .cache location unless told otherwise
         self.auth_manager = SpotifyOAuth(
-            scope='user-read-playback-state user-modify-playback-state',
+            scope=scope,
             open_browser=False,
-            show_dialog=True  # Force showing the auth dialog
+            show_dialog=True,  # Force showing the auth dialog
+            cache_path=cache_path
         )
         logger.info("SpotifyOAuth manager initialized")
         self._load_client()
     
     def _load_client(self):
-        """Load or refresh the Spotify client"""
+        """Load or refresh the Spotify client
+
+        Returns False if there is no usable token, leaving the exception in
+        _load_error when that was because loading or refreshing it failed.
+        """
+        self._load_error = None
         try:
             token_info = self.auth_manager.get_cached_token()
             
             if token_info and not self.auth_manager.is_token_expired(token_info):
+                self.token_info = token_info
                 self.client = spotipy.Spotify(auth=token_info['access_token'])
                 logger.info("Successfully initialized Spotify client")
                 return True
@@ -46,6 +102,7 @@ class SpotifyClient:
                 logger.info("Token expired, refreshing...")
                 token_info = self.auth_manager.refresh_access_token(token_info['refresh_token'])
                 if token_info:
+                    self.token_info = token_info
                     self.client = spotipy.Spotify(auth=token_info['access_token'])
                     logger.info("Successfully refreshed token and initialized client")
                     return True
@@ -56,33 +113,92 @@ class SpotifyClient:
             
         except Exception as e:
             logger.error(f"Error loading client: {e}")
+            self._load_error = e
         return False
     
+    def _reset_poll_stats(self):
+        """Start a new poll cost reporting window"""
+        self._stats_started = time.monotonic()
+        self.polls = 0
+        self.polls_not_modified = 0
+        self.bytes_received = 0
+        self.poll_cpu_seconds = 0
+
+    def _log_poll_stats(self):
+        """Periodically report how much polling costs"""
+        elapsed = time.monotonic() - self._stats_started
+        if elapsed < POLL_STATS_INTERVAL:
+            return
+        hours = elapsed / 3600
+        logger.info(
+            f"Playback polling: {self.polls / hours:.0f} polls/h "
+            f"({self.polls_not_modified} not modified), "
+            f"{self.bytes_received / 1024 / hours:.0f} KB/h received, "
+            f"{1000 * self.poll_cpu_seconds / max(self.polls, 1):.2f} ms CPU per poll"
+        )
+        self._reset_poll_stats()
+
+    def _poll_playback(self):
+        """Fetch playback state, revalidating with the last ETag if we have one"""
+        headers = {'Authorization': f"Bearer {self.token_info['access_token']}"}
+        if self._etag:
+            headers['If-None-Match'] = self._etag
+
+        response = self.session.get(PLAYER_URL, headers=headers, timeout=10)
+        # Body plus a rough allowance for the status line and headers
+        self.bytes_received += len(response.content) + sum(len(k) + len(v) + 4 for k, v in response.headers.items())
+
+        if response.status_code == 304:
+            self.polls_not_modified += 1
+            return self._playback
+
+        if response.status_code == 429:
+            try:
+                self.retry_after = int(response.headers.get('Retry-After', 1))
+            except ValueError:
+                self.retry_after = 1
+        if response.status_code == 401:
+            # Force a token reload before the next poll
+            self.token_info = None
+        response.raise_for_status()
+
+        # Only a successful empty response means nothing is playing; an
+        # empty error body was raised above as the outage it is
+        if response.status_code == 204 or not response.content:
+            self._etag = None
+            self._playback = None
+            return None
+
+        self._etag = response.headers.get('ETag')
+        self._playback = PlaybackState.from_api(response.json())
+        return self._playback
+
     def get_current_track(self):
-        """Get the currently playing track information"""
+        """Get the currently playing track as a PlaybackState
+
+        Returns None when nothing is playing. API and network errors are
+        re-raised so callers can tell an outage apart from an idle player.
+        """
         try:
-            if not self.client:
-                logger.warning("No Spotify client available")
+            if not self.client or not self.token_info or self.auth_manager.is_token_expired(self.token_info):
+                if not self.client:
+                    logger.warning("No Spotify client available")
                 if not self._load_client():
+                    if self._load_error is not None:
+                        # The token couldn't be refreshed (e.g. the network
+                        # is down): an outage, not an idle player
+                        raise self._load_error
                     return None
             
-            current = self.client.current_playback()
-            
-            if current and current.get('item'):
-                track_info = {
-                    'name': current['item']['name'],
-                    'artist': current['item']['artists'][0]['name'],
-                    'album': current['item']['album']['name'],
-                    'album_art_url': current['item']['album']['images'][0]['url']
-                }
-                return track_info
-            
-            return None
+            self.retry_after = None
+            started = time.process_time()
+            try:
+                return self._poll_playback()
+            finally:
+                self.polls += 1
+                self.poll_cpu_seconds += time.process_time() - started
+                self._log_poll_stats()
                 
         except Exception as e:
             logger.error(f"Error getting current track: {e}")
-            # Try to refresh token on error
-            if "token expired" in str(e).lower():
-                logger.info("Token expired, attempting to reload client")
-                self._load_client()
-        return None
\ No newline at end of file
+            raise
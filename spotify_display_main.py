@@ -3,6 +3,10 @@ import os
 import time
 import signal
 import sys
+
+# Start of the time-to-first-pixel measurement, before the heavy imports
+STARTED = time.monotonic()
+
 from utils.logger import setup_logger
 
 # Set up logging first
@@ -12,9 +16,14 @@ logger.info("Starting spotify_display_main.py")
 from display_manager import DisplayManager
 from spotify_client import SpotifyClient
 from utils.network import wait_for_network
+from utils.resilience import CircuitBreaker, CircuitOpenError, backoff_delay
+from utils.idle import IdleMonitor
+from utils.snapshot import save_snapshot, load_snapshot
 from config import AUTH_SERVER_PORT, get_local_ip
+from config import PLAYBACK_POLL_INTERVAL, IDLE_AFTER, IDLE_POLL_MIN, IDLE_POLL_MAX, IDLE_DEVICE_POLL_INTERVAL, WAKE_WINDOW
+from config import SNAPSHOT_PATH, SNAPSHOT_MAX_AGE
 from spotipy.oauth2 import SpotifyOAuth
-from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI
+from config import SPOTIFY_CLIENT_ID, SPOTIFY_CLIENT_SECRET, SPOTIFY_REDIRECT_URI, SPOTIFY_SCOPE
 
 logger = setup_logger('main', 'main.log')
 
@@ -25,7 +34,7 @@ def check_auth_token():
             client_id=SPOTIFY_CLIENT_ID,
             client_secret=SPOTIFY_CLIENT_SECRET,
             redirect_uri=SPOTIFY_REDIRECT_URI,
-            scope='user-read-playback-state user-modify-playback-state',
+            scope=SPOTIFY_SCOPE,
             open_browser=False
         )
         token_info = auth_manager.get_cached_token()
@@ -44,10 +53,23 @@ class SpotifyDisplay:
             self.display = DisplayManager()
             logger.info("DisplayManager initialized successfully")
             
-            # Show startup sequence
-            self.display.display_startup_sequence()
+            # After a crash or upgrade, put the last frame straight back up.
+            # Otherwise show the startup sequence.
+            self.snapshot = load_snapshot(SNAPSHOT_PATH, SNAPSHOT_MAX_AGE)
+            if self.snapshot:
+                state, frame = self.snapshot
+                if frame and not state.get('idle'):
+                    self.display.restore_frame(frame, state.get('art_url'))
+                else:
+                    self.display.clear_display()
+                self._log_first_pixel('warm')
+            else:
+                self.display.display_startup_sequence()
+                self._log_first_pixel('cold')
             
-            # Check if we need auth
+            # Check if we need auth. Even a warm boot checks: the token cache
+            # may have been deleted (account switch) since the snapshot, and
+            # reading it costs no network.
             if not check_auth_token():
                 logger.info("No auth token found, starting auth flow")
                 self.display.display_text("Visit", duration=2)
@@ -76,8 +98,27 @@ class SpotifyDisplay:
             logger.error(f"Failed to initialize SpotifyClient: {e}")
             raise
             
+        # Stops polling a failing API; the last frame stays up meanwhile
+        self.track_breaker = CircuitBreaker('Spotify playback')
+        
+        # Backs polling off and blanks the panel once nothing has played for a while
+        self.idle = IdleMonitor(
+            active_interval=PLAYBACK_POLL_INTERVAL,
+            idle_after=IDLE_AFTER,
+            idle_min_interval=IDLE_POLL_MIN,
+            idle_max_interval=IDLE_POLL_MAX,
+            device_interval=IDLE_DEVICE_POLL_INTERVAL,
+            wake_window=WAKE_WINDOW
+        )
+        
+        self.last_track = None
+        self._saved = None  # What the last snapshot recorded, to skip redundant writes
+        if self.snapshot:
+            self._restore_state(*self.snapshot)
+        
         signal.signal(signal.SIGTERM, self.handle_signal)
         signal.signal(signal.SIGINT, self.handle_signal)
+        signal.signal(signal.SIGUSR1, self.handle_wake)
         logger.info("Signal handlers registered")
     
     def handle_signal(self, signum, frame):
@@ -85,35 +126,94 @@ class SpotifyDisplay:
         logger.info(f"Received signal {signum}")
         self.running = False
     
+    def _log_first_pixel(self, kind):
+        """Log how long after process start the panel first showed something"""
+        shown_at = self.display.first_frame_at or time.monotonic()
+        logger.info(f"Time to first pixel ({kind} boot): {1000 * (shown_at - STARTED):.0f}ms")
+    
+    def _restore_state(self, state, frame):
+        """Resume polling where the previous process left off"""
+        elapsed = max(0, time.time() - state['saved_at'])
+        self.last_track = state.get('track_id')
+        self.idle.restore(state.get('idle_monitor', {}), elapsed)
+        self.track_breaker.restore(state.get('breaker', {}), elapsed)
+        if state.get('idle'):
+            self.display.set_idle(True)
+        logger.info(f"Warm boot from a {elapsed:.0f}s old snapshot (track {self.last_track}, {self.idle.state})")
+    
+    def save_snapshot(self):
+        """Record what is on the panel, if it changed since the last snapshot"""
+        key = (self.last_track, self.display.current_art_url, self.display.idle, self.track_breaker.state)
+        if key == self._saved:
+            return
+        state = {
+            'track_id': self.last_track,
+            'art_url': self.display.current_art_url,
+            'idle': self.display.idle,
+            'idle_monitor': self.idle.snapshot(),
+            'breaker': self.track_breaker.snapshot()
+        }
+        frame = self.display.current_image.tobytes() if self.display.current_image else None
+        if save_snapshot(SNAPSHOT_PATH, state, frame):
+            self._saved = key
+    
+    def handle_wake(self, signum, frame):
+        """Poll straight away, e.g. `pkill -USR1 -f spotify_display_main`"""
+        self.idle.wake()
+    
+    def _sleep(self, seconds, wakeable=True):
+        """Sleep in short slices so signals stop or wake the loop promptly
+
+        Error backoff isn't wakeable: the wake request stays pending until
+        a poll succeeds and IdleMonitor.update() takes it, so cutting those
+        sleeps short would retry a failing API in a tight loop.
+        """
+        end = time.monotonic() + seconds
+        while self.running and not (wakeable and self.idle.wake_requested) and time.monotonic() < end:
+            time.sleep(min(0.25, max(0, end - time.monotonic())))
+    
     def run(self):
-        """Main application loop"""
+        """Main application loop
+
+        Never exits on its own: errors back off and the last frame stays on
+        the panel until Spotify is reachable again.
+        """
         logger.info("Starting Spotify Display")
         
-        # Wait for network connection
-        if not wait_for_network():
-            logger.error("Failed to connect to network")
-            return
+        # A warm boot was online moments ago, so go straight to polling
+        if not self.snapshot and not wait_for_network():
+            logger.warning("No network yet, will keep retrying in the main loop")
         
-        last_track = None
+        last_track = self.last_track
         error_count = 0
-        no_track_logged = False
+        no_track_logged = self.snapshot is not None and self.display.current_image is None
         
         while self.running:
             try:
                 logger.debug("Fetching current track from Spotify")
-                current_track = self.spotify.get_current_track()
+                current_track = self.track_breaker.call(self.spotify.get_current_track)
+                error_count = 0
+                
+                if self.idle.update(current_track):
+                    self.display.set_idle(self.idle.state == IdleMonitor.IDLE)
+                    if self.display.idle:
+                        last_track = None  # Redraw whatever plays next
                 
-                if current_track:
-                    # Generate a unique ID for the track
-                    track_id = f"{current_track['name']}-{current_track['artist']}"
+                if self.display.idle:
+                    logger.debug(f"Idle, next poll in {self.idle.interval():.0f}s")
+                elif current_track:
+                    track_id = current_track.item_id
                     
-                    if track_id != last_track:
-                        logger.info(f"New track: {current_track['name']} by {current_track['artist']}")
-                        logger.debug(f"Album art URL: {current_track['album_art_url']}")
-                        self.display.update_display(current_track['album_art_url'])
+                    # Also retry tracks whose art failed to load last time
+                    art_missing = current_track.album_art_url and self.display.current_art_url != current_track.album_art_url
+                    if track_id != last_track or art_missing:
+                        if track_id != last_track:
+                            logger.info(f"New track: {current_track.name} by {current_track.artist}")
+                        logger.debug(f"Album art URL: {current_track.album_art_url}")
+                        if current_track.album_art_url:
+                            self.display.update_display(current_track.album_art_url)
                         last_track = track_id
                         no_track_logged = False
-                        error_count = 0
                     else:
                         logger.debug("Same track playing, no update needed")
                 else:
@@ -126,19 +226,25 @@ class SpotifyDisplay:
                     else:
                         logger.debug("No track playing, display already cleared")
                 
-                time.sleep(2)  # Reduced polling frequency to match Spotify's rate limits
+                self.last_track = last_track
+                self.save_snapshot()
+                self._sleep(self.idle.interval())
+            
+            except CircuitOpenError as e:
+                logger.debug(f"{e}, keeping last frame")
+                self._sleep(max(self.track_breaker.retry_in(), 2), wakeable=False)
             
             except Exception as e:
                 logger.error(f"Error in main loop: {e}")
                 error_count += 1
-                
-                if error_count > 5:
-                    logger.error("Too many errors, exiting")
-                    break
-                
-                time.sleep(5)
+                # Honour Retry-After on 429s, otherwise back off with jitter
+                delay = self.spotify.retry_after or backoff_delay(error_count, base=2, cap=60)
+                self._sleep(max(delay, 2), wakeable=False)
         
-        # Cleanup
+        # Cleanup, recording what was showing so a restart can put it back
+        self.last_track = last_track
+        self._saved = None
+        self.save_snapshot()
         self.display.clear_display()
         logger.info("Spotify Display stopped")
 
@@ -0,0 +1,152 @@
+#!/usr/bin/env python3
+import sys
+import time
+import signal
+import gc
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger('driver', 'driver.log')
+logger.info("Starting spotify_matrix_driver.py")
+
+from utils.matrix import create_matrix
+from utils.frame_buffer import FrameRingReader
+from config import get_matrix_options, FRAME_BUFFER_PATH, FRAME_BUFFER_POLL_INTERVAL, FRAME_BUFFER_IDLE_POLL_INTERVAL
+
+class MatrixDriver:
+    def __init__(self, path=FRAME_BUFFER_PATH, stats_interval=60):
+        """Own the RGBMatrix and show frames published by the producer
+
+        This is the only process that needs root. It does no network, decode
+        or animation work, so nothing stalls the matrix refresh thread.
+        """
+        logger.info("Initializing MatrixDriver")
+        self.running = True
+        options = get_matrix_options()
+        self.reader = FrameRingReader(path, options['cols'], options['rows'])
+        self.matrix = create_matrix()
+        self.offscreen_canvas = self.matrix.CreateFrameCanvas()
+        # Reused for every frame so the loop does not allocate
+        self.frame = Image.new('RGB', (options['cols'], options['rows']))
+        # Nothing shown yet, so a frame already in the ring (e.g. after the
+        # driver restarts) goes straight to the panel
+        self.shown = 0
+        self.brightness = options['brightness']
+        self.paused = False
+
+        self.stats_interval = stats_interval
+        self._reset_stats()
+
+        signal.signal(signal.SIGTERM, self.handle_signal)
+        signal.signal(signal.SIGINT, self.handle_signal)
+
+    def handle_signal(self, signum, frame):
+        """Handle termination signals"""
+        logger.info(f"Received signal {signum}")
+        self.running = False
+
+    def _reset_stats(self):
+        """Start a new stats window"""
+        self._stats_started = time.monotonic()
+        self._cpu_started = time.process_time()
+        self._frames = 0
+        self._skipped = 0
+        self._latency_total = 0
+        self._latency_max = 0
+        self._swap_max = 0
+        self._torn_started = self.reader.torn_reads
+
+    def _log_stats(self):
+        """Periodically log refresh stability and driver CPU usage"""
+        now = time.monotonic()
+        elapsed = now - self._stats_started
+        if elapsed < self.stats_interval:
+            return
+        cpu = time.process_time() - self._cpu_started
+        average = self._latency_total / self._frames if self._frames else 0
+        logger.info(
+            f"Driver: {self._frames} frames shown, {self._skipped} skipped, "
+            f"{self.reader.torn_reads - self._torn_started} torn reads in {elapsed:.0f}s; "
+            f"latency avg {average:.1f}ms max {self._latency_max:.1f}ms; "
+            f"longest swap {self._swap_max:.1f}ms; CPU {100 * cpu / elapsed:.1f}%"
+        )
+        self._reset_stats()
+
+    def show(self, number):
+        """Copy frame `number` to the panel, returning False if it was torn"""
+        published = self.reader.read_into(self.frame, number)
+        if published is None:
+            return False
+
+        self.offscreen_canvas.SetImage(self.frame)
+        swap_started = time.monotonic_ns()
+        self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+        done = time.monotonic_ns()
+
+        self._frames += 1
+        latency = (done - published) / 1e6
+        self._latency_total += latency
+        self._latency_max = max(self._latency_max, latency)
+        self._swap_max = max(self._swap_max, (done - swap_started) / 1e6)
+        return True
+
+    def pause(self):
+        """Blank the panel and slow the loop while the producer is idle
+
+        rgbmatrix can't stop or slow its refresh thread without tearing the
+        matrix down, and it can't be set up again once root is dropped, so
+        the panel is blanked at zero brightness instead.
+        """
+        self.offscreen_canvas.Clear()
+        self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+        self.matrix.brightness = 0
+        self.paused = True
+        logger.info("Display idle, driver paused")
+
+    def resume(self):
+        """Restore brightness once the producer wakes"""
+        self.matrix.brightness = self.brightness
+        self.paused = False
+        logger.info("Display awake, driver resumed")
+
+    def run(self):
+        """Main driver loop"""
+        # The loop allocates almost nothing, so keep the collector out of the way
+        gc.collect()
+        gc.freeze()
+
+        while self.running:
+            if self.reader.idle():
+                if not self.paused:
+                    self.pause()
+                self._log_stats()
+                time.sleep(FRAME_BUFFER_IDLE_POLL_INTERVAL)
+                continue
+            if self.paused:
+                self.resume()
+
+            latest = self.reader.latest()
+            if latest != self.shown:
+                if self.show(latest):
+                    if self.shown and latest > self.shown + 1:
+                        self._skipped += latest - self.shown - 1
+                    self.shown = latest
+                # A torn read means a newer frame is already being written,
+                # so loop straight round and pick that one up
+                continue
+
+            self._log_stats()
+            time.sleep(FRAME_BUFFER_POLL_INTERVAL)
+
+        self.offscreen_canvas.Clear()
+        self.offscreen_canvas = self.matrix.SwapOnVSync(self.offscreen_canvas)
+        self.reader.close()
+        logger.info("Matrix driver stopped")
+
+if __name__ == "__main__":
+    try:
+        driver = MatrixDriver()
+        driver.run()
+    except Exception as e:
+        logger.error(f"Fatal error: {e}")
+        sys.exit(1)
@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""Load test the auth server against a local stand-in for Spotify's token endpoint
+
+Simulates several phones hitting the setup page at once and reports page
+latency percentiles, plus how many token endpoint calls the page cost.
+
+    python tools/auth_load_test.py --clients 8 --requests 400
+"""
+import os
+import sys
+import json
+import time
+import logging
+import argparse
+import tempfile
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import requests
+
+class TokenEndpoint(BaseHTTPRequestHandler):
+    """Stand-in for accounts.spotify.com/api/token"""
+    calls = 0
+
+    def do_POST(self):
+        TokenEndpoint.calls += 1
+        self.rfile.read(int(self.headers.get('Content-Length', 0)))
+        time.sleep(0.05)  # Roughly a round trip to Spotify
+        body = json.dumps({
+            'access_token': f'access-{TokenEndpoint.calls}',
+            'token_type': 'Bearer',
+            'expires_in': 3600,
+            'refresh_token': 'refresh',
+            'scope': 'user-read-playback-state user-modify-playback-state',
+        }).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+def start_in_thread(server, run):
+    """Run a server loop on a daemon thread"""
+    threading.Thread(target=run, daemon=True).start()
+    return server
+
+def start_app(app, mode, threads):
+    """Serve the Flask app on a free local port, returning its base URL"""
+    if mode == 'production':
+        from waitress import create_server
+        server = create_server(app, host='127.0.0.1', port=0, threads=threads)
+        start_in_thread(server, server.run)
+        return f"http://127.0.0.1:{server.effective_port}"
+
+    from werkzeug.serving import make_server
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    start_in_thread(server, server.serve_forever)
+    return f"http://127.0.0.1:{server.server_port}"
+
+def run_load(url, clients, count):
+    """Fire `count` GETs from `clients` concurrent sessions and time them"""
+    local = threading.local()
+
+    def fetch(_):
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+        started = time.perf_counter()
+        response = local.session.get(url, timeout=30)
+        response.raise_for_status()
+        return time.perf_counter() - started
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = sorted(pool.map(fetch, range(count)))
+    elapsed = time.perf_counter() - started
+    return latencies, elapsed
+
+def report(name, latencies, elapsed, token_calls):
+    """Print latency percentiles for one scenario"""
+    def percentile(p):
+        return 1000 * latencies[min(len(latencies) - 1, int(p / 100 * len(latencies)))]
+    print(f"{name:28s} {len(latencies) / elapsed:7.0f} req/s  "
+          f"p50 {percentile(50):6.1f}ms  p95 {percentile(95):6.1f}ms  "
+          f"p99 {percentile(99):6.1f}ms  max {1000 * latencies[-1]:6.1f}ms  "
+          f"token calls {token_calls}")
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--clients', type=int, default=8, help="Concurrent clients")
+    parser.add_argument('--requests', type=int, default=400, help="Requests per scenario")
+    parser.add_argument('--mode', choices=['production', 'dev'], default='production')
+    parser.add_argument('--threads', type=int, default=4, help="WSGI worker threads in production mode")
+    args = parser.parse_args()
+
+    # Per-request access logs and queue depth warnings would swamp the report
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    logging.getLogger('waitress.queue').setLevel(logging.ERROR)
+
+    token_server = ThreadingHTTPServer(('127.0.0.1', 0), TokenEndpoint)
+    start_in_thread(token_server, token_server.serve_forever)
+
+    with tempfile.TemporaryDirectory() as workdir:
+        # spotipy keeps its token in ./.cache, so keep the real one out of harm's way
+        os.chdir(workdir)
+        from spotipy.oauth2 import SpotifyOAuth
+        SpotifyOAuth.OAUTH_TOKEN_URL = f"http://127.0.0.1:{token_server.server_port}/api/token"
+        import spotify_auth_server
+
+        base_url = start_app(spotify_auth_server.app, args.mode, args.threads)
+        print(f"Auth server ({args.mode}) at {base_url}, {args.clients} clients, {args.requests} requests each\n")
+
+        calls = TokenEndpoint.calls
+        latencies, elapsed = run_load(f"{base_url}/", args.clients, args.requests)
+        report("index, not connected", latencies, elapsed, TokenEndpoint.calls - calls)
+
+        requests.get(f"{base_url}/callback", params={'code': 'load-test'}, timeout=30).raise_for_status()
+
+        calls = TokenEndpoint.calls
+        latencies, elapsed = run_load(f"{base_url}/", args.clients, args.requests)
+        report("index, connected", latencies, elapsed, TokenEndpoint.calls - calls)
+
+        # An expired access token must not cost a refresh on the page path
+        cache_path = spotify_auth_server.auth_manager.cache_handler.cache_path
+        with open(cache_path) as f:
+            token_info = json.load(f)
+        token_info['expires_at'] = int(time.time()) - 60
+        with open(cache_path, 'w') as f:
+            json.dump(token_info, f)
+
+        calls = TokenEndpoint.calls
+        latencies, elapsed = run_load(f"{base_url}/", args.clients, args.requests)
+        report("index, token expired", latencies, elapsed, TokenEndpoint.calls - calls)
+
+    token_server.shutdown()
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
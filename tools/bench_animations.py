@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+"""Benchmark animation pacing on a headless display and assert frame timing
+
+Runs fades and rainbow text through the shared frame clock in real time,
+with a simulated panel whose swaps block until the next refresh, and fails
+if too many frames are late or skipped or jitter is too high.
+
+    python tools/bench_animations.py --fades 20 --max-late 0.05 --max-jitter-ms 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Render the startup pack and anything else cached into a scratch directory
+# rather than the real cache
+CACHE_DIR = tempfile.TemporaryDirectory()
+os.environ['SPOTIFY_MATRIX_CACHE_DIR'] = CACHE_DIR.name
+
+from PIL import Image
+from display_manager import DisplayManager, NullMatrix
+
+class VSyncMatrix(NullMatrix):
+    """NullMatrix whose swaps block until the next refresh, like the real panel"""
+    def __init__(self, refresh_rate_hz):
+        self.period = 1.0 / refresh_rate_hz
+        self.epoch = time.monotonic()
+
+    def SwapOnVSync(self, canvas):
+        elapsed = time.monotonic() - self.epoch
+        time.sleep(self.period - elapsed % self.period)
+        return canvas
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--fades', type=int, default=20, help="Fade transitions to run")
+    parser.add_argument('--rainbows', type=int, default=3, help="Rainbow text passes to run")
+    parser.add_argument('--refresh-hz', type=float, default=100, help="Simulated panel refresh rate")
+    parser.add_argument('--max-late', type=float, default=0.05, help="Highest allowed fraction of late frames")
+    parser.add_argument('--max-skipped', type=float, default=0.05, help="Highest allowed fraction of skipped frames")
+    parser.add_argument('--max-jitter-ms', type=float, default=4.0, help="Highest allowed lateness jitter")
+    args = parser.parse_args()
+
+    display = DisplayManager(output='null')
+    display.matrix = VSyncMatrix(args.refresh_hz)
+
+    art = [Image.new('RGB', (64, 64), color) for color in ((200, 30, 30), (30, 200, 30), (30, 30, 200))]
+    fade_started = time.monotonic()
+    for i in range(args.fades):
+        display.display_image(art[i % len(art)])
+    fade_time = time.monotonic() - fade_started
+    fade_stats = display.clock.stats.summary()
+
+    rainbow_started = time.monotonic()
+    for _ in range(args.rainbows):
+        display._animate_rainbow_text("SPOTIFY", duration=1.0, steps=30)
+    rainbow_time = time.monotonic() - rainbow_started
+    display.close_frame_pack('startup')
+
+    stats = display.clock.stats
+    presented = stats.frames + stats.skipped
+    late_fraction = stats.late / presented if presented else 0
+    skipped_fraction = stats.skipped / presented if presented else 0
+
+    print(f"Fades:   {args.fades} in {fade_time:.2f}s ({fade_time / max(1, args.fades) * 1000:.0f} ms each, target {30 / 60 * 1000:.0f} ms)")
+    print(f"         {fade_stats}")
+    print(f"Rainbow: {args.rainbows} in {rainbow_time:.2f}s (target {args.rainbows * 29 / 30:.2f}s)")
+    print(f"Total:   {stats.summary()}")
+
+    failures = []
+    if late_fraction > args.max_late:
+        failures.append(f"{late_fraction:.1%} of frames late (limit {args.max_late:.1%})")
+    if skipped_fraction > args.max_skipped:
+        failures.append(f"{skipped_fraction:.1%} of frames skipped (limit {args.max_skipped:.1%})")
+    if stats.jitter * 1000 > args.max_jitter_ms:
+        failures.append(f"jitter {stats.jitter * 1000:.1f}ms (limit {args.max_jitter_ms}ms)")
+
+    for image in art:
+        image.close()
+
+    if failures:
+        print("FAIL: " + "; ".join(failures))
+        return 1
+    print("PASS")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""Benchmark loading cached frames from a frame pack against decoding PNGs
+
+    python tools/bench_frame_pack.py --frames 300
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image
+from utils.frame_pack import FramePackReader, FramePackWriter, RGB888, RGB565
+
+def make_frames(count):
+    """Build varied 64x64 frames that compress like album art and text"""
+    rng = np.random.default_rng(0)
+    frames = []
+    for i in range(count):
+        gradient = np.linspace(0, 255, 64, dtype=np.uint8)
+        frame = np.dstack([np.tile(gradient, (64, 1)), np.tile(gradient[:, None], (1, 64)), np.full((64, 64), i % 256, np.uint8)])
+        frame[rng.integers(0, 64, 200), rng.integers(0, 64, 200)] = rng.integers(0, 256, (200, 3))
+        frames.append(np.ascontiguousarray(frame))
+    return frames
+
+def best_of(repeats, func):
+    """Run func several times and return the fastest wall time"""
+    best = None
+    for _ in range(repeats):
+        started = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300)
+    parser.add_argument('--repeats', type=int, default=5)
+    args = parser.parse_args()
+
+    frames = make_frames(args.frames)
+    target = Image.new('RGB', (64, 64))  # Like a pooled frame about to go to the canvas
+
+    with tempfile.TemporaryDirectory() as workdir:
+        png_paths = []
+        for i, frame in enumerate(frames):
+            path = os.path.join(workdir, f"{i:04d}.png")
+            Image.fromarray(frame).save(path)
+            png_paths.append(path)
+
+        pack_paths = {}
+        for name, pixel_format in (('RGB888', RGB888), ('RGB565', RGB565)):
+            path = os.path.join(workdir, f"{name}.pack")
+            with FramePackWriter(path, pixel_format=pixel_format) as writer:
+                for i, frame in enumerate(frames):
+                    writer.add(f"{i:04d}", frame)
+            pack_paths[name] = path
+
+        def load_pngs():
+            for path in png_paths:
+                with Image.open(path) as image:
+                    image.load()
+                    target.paste(image)
+
+        def load_pack(path):
+            def run():
+                with FramePackReader(path) as reader:
+                    for key in reader.keys():
+                        reader.load_into(target, key)
+            return run
+
+        def open_pack_views(path):
+            def run():
+                with FramePackReader(path) as reader:
+                    for key in reader.keys():
+                        reader.frame(key)
+            return run
+
+        results = [
+            ('PNG decode', best_of(args.repeats, load_pngs), sum(os.path.getsize(p) for p in png_paths)),
+            ('pack RGB888 -> image', best_of(args.repeats, load_pack(pack_paths['RGB888'])), os.path.getsize(pack_paths['RGB888'])),
+            ('pack RGB888 views only', best_of(args.repeats, open_pack_views(pack_paths['RGB888'])), os.path.getsize(pack_paths['RGB888'])),
+            ('pack RGB565 -> image', best_of(args.repeats, load_pack(pack_paths['RGB565'])), os.path.getsize(pack_paths['RGB565'])),
+        ]
+
+    baseline = results[0][1]
+    print(f"{args.frames} frames of 64x64, best of {args.repeats}\n")
+    for name, elapsed, size in results:
+        print(f"{name:24s} {1000 * elapsed:8.2f} ms  {1e6 * elapsed / args.frames:7.1f} us/frame  "
+              f"{baseline / elapsed:6.1f}x  {size / 1024:8.0f} KB on disk")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
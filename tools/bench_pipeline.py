@@ -0,0 +1,73 @@
+#!/usr/bin/env python3
+"""Benchmark art pipeline throughput against the number of worker processes
+
+Feeds synthetic JPEG covers (as bytes, so the network isn't measured)
+through ArtPipeline into a temporary art cache with 1, 2, ... workers up to
+the CPU count, and compares with decoding on one thread. Fails if the best
+run doesn't reach --min-efficiency of linear scaling.
+
+    python tools/bench_pipeline.py --images 200 --min-efficiency 0.7
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from bench_resize import make_cover
+from utils.art_cache import ArtCache, decode_frame
+from utils.art_pipeline import ArtPipeline
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=200, help="Covers to process per run")
+    parser.add_argument('--size', type=int, default=640, help="Cover size in pixels")
+    parser.add_argument('--tier', default='quality', help="Resize tier")
+    parser.add_argument('--workers', type=int, nargs='+', help="Worker counts to try (default 1..CPU count)")
+    parser.add_argument('--min-efficiency', type=float, default=0.0, help="Required speedup / workers for the largest count")
+    args = parser.parse_args()
+
+    worker_counts = args.workers or list(range(1, (os.cpu_count() or 1) + 1))
+    covers = [(f"https://example.invalid/cover/{i}", make_cover(i, args.size)) for i in range(args.images)]
+
+    started = time.perf_counter()
+    for _, content in covers:
+        decode_frame(content, args.tier)
+    serial = args.images / (time.perf_counter() - started)
+    print(f"{args.images} covers at {args.size}px, {args.tier} resize, {os.cpu_count()} CPU cores\n")
+    print(f"{'single thread':16s} {serial:8.1f} images/s")
+
+    rates = {}
+    for workers in worker_counts:
+        with tempfile.TemporaryDirectory() as cache_dir:
+            pipeline = ArtPipeline(ArtCache(cache_dir), workers=workers, tier=args.tier)
+            # Start the workers and import their modules before timing
+            for _ in pipeline.process(covers[:workers], skip_cached=False):
+                pass
+
+            started = time.perf_counter()
+            results = sum(1 for _, data in pipeline.process(covers, skip_cached=False) if data is not None)
+            elapsed = time.perf_counter() - started
+            pipeline.close()
+
+            cached, _ = pipeline.art_cache.disk_usage()
+            if results != args.images or cached != args.images:
+                print(f"FAIL: {workers} workers returned {results} frames and cached {cached}, expected {args.images}")
+                return 1
+        rates[workers] = args.images / elapsed
+        speedup = rates[workers] / rates[worker_counts[0]] * worker_counts[0]
+        print(f"{workers:2d} worker(s)     {rates[workers]:8.1f} images/s  {speedup:5.2f}x  "
+              f"efficiency {speedup / workers:.0%}  ({rates[workers] / serial:.2f}x single thread)")
+
+    largest = worker_counts[-1]
+    efficiency = rates[largest] / rates[worker_counts[0]] * worker_counts[0] / largest
+    if efficiency < args.min_efficiency:
+        print(f"FAIL: {largest} workers scaled at {efficiency:.0%} (required {args.min_efficiency:.0%})")
+        return 1
+    print("PASS")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
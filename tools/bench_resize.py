@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+"""Benchmark album art resize tiers for speed and quality
+
+Decodes synthetic 640px and 300px JPEG covers to 64x64 frames with every
+tier in utils/resample.py. Quality is PSNR against an exact area average of
+the fully decoded image, plus edge energy relative to that reference (above
+1.0 means sharper). Also times the NumPy batch path used for warmup and
+the cached weight lookup.
+
+    python tools/bench_resize.py --images 40
+"""
+import os
+import sys
+import time
+import argparse
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import numpy as np
+from PIL import Image, ImageDraw
+from utils.art_cache import decode_frame, FRAME_SIZE
+from utils.resample import TIERS, area_resize, area_resize_batch, area_weights, draft
+
+def make_cover(index, size):
+    """Build a JPEG cover with gradients, hard edges, noise and small text"""
+    rng = np.random.default_rng(index)
+    ramp = np.linspace(0, 255, size)
+    pixels = np.dstack([np.tile(ramp, (size, 1)), np.tile(ramp[:, None], (1, size)), np.full((size, size), (index * 47) % 256)])
+    pixels += rng.normal(0, 12, pixels.shape)
+    image = Image.fromarray(np.clip(pixels, 0, 255).astype(np.uint8))
+    draw = ImageDraw.Draw(image)
+    for i in range(6):
+        x, y = rng.integers(0, size * 3 // 4, 2)
+        draw.rectangle((x, y, x + size // 6, y + size // 8), fill=tuple(int(c) for c in rng.integers(0, 256, 3)))
+    draw.text((size // 10, size * 4 // 5), f"ALBUM {index}", fill=(255, 255, 255), font_size=size // 10)
+    with BytesIO() as buffer:
+        image.save(buffer, 'JPEG', quality=90)
+        image.close()
+        return buffer.getvalue()
+
+def reference_frame(content):
+    """Exact area average of the fully decoded image, in float"""
+    with Image.open(BytesIO(content)) as image:
+        return area_resize(np.asarray(image.convert('RGB')), FRAME_SIZE).astype(np.float64)
+
+def psnr(frame, reference):
+    """Peak signal-to-noise ratio in dB"""
+    mse = np.mean((frame.astype(np.float64) - reference) ** 2)
+    return float('inf') if mse == 0 else 10 * np.log10(255 ** 2 / mse)
+
+def edge_energy(frame):
+    """Mean absolute difference between neighbouring pixels"""
+    frame = frame.astype(np.float64)
+    return np.abs(np.diff(frame, axis=0)).mean() + np.abs(np.diff(frame, axis=1)).mean()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--images', type=int, default=40, help="Covers per source size")
+    parser.add_argument('--sizes', type=int, nargs='+', default=[640, 300], help="Source cover sizes")
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        covers = [make_cover(i, size) for i in range(args.images)]
+        references = [reference_frame(content) for content in covers]
+        reference_edges = np.mean([edge_energy(r) for r in references])
+
+        print(f"\n{args.images} covers at {size}px")
+        print(f"{'tier':10s} {'ms/image':>9s} {'PSNR dB':>8s} {'edges':>6s}")
+        for tier in TIERS:
+            decode_frame(covers[0], tier)  # Warm caches and imports
+            started = time.perf_counter()
+            frames = [decode_frame(content, tier) for content in covers]
+            elapsed = time.perf_counter() - started
+
+            arrays = [np.frombuffer(data, np.uint8).reshape(FRAME_SIZE[1], FRAME_SIZE[0], 3) for data in frames]
+            quality = np.mean([psnr(a, r) for a, r in zip(arrays, references)])
+            edges = np.mean([edge_energy(a) for a in arrays]) / reference_edges
+            print(f"{tier:10s} {1000 * elapsed / args.images:9.2f} {quality:8.2f} {edges:6.2f}")
+
+        # Resize cost alone for the area path, from full and draft decodes
+        for label, tier in (('full decode', 'quality'), ('draft decode', 'area')):
+            decoded = []
+            for content in covers:
+                with Image.open(BytesIO(content)) as image:
+                    draft(image, tier, FRAME_SIZE)
+                    decoded.append(np.asarray(image.convert('RGB')))
+            started = time.perf_counter()
+            area_resize_batch(decoded, FRAME_SIZE)
+            elapsed = time.perf_counter() - started
+            print(f"area_resize_batch from {label} ({decoded[0].shape[1]}px): {1000 * elapsed / args.images:.2f} ms/image")
+
+    area_weights.cache_clear()
+    started = time.perf_counter()
+    area_weights(640, 64)
+    cold = time.perf_counter() - started
+    started = time.perf_counter()
+    area_weights(640, 64)
+    warm = time.perf_counter() - started
+    print(f"\narea weights 640->64: built in {1e6 * cold:.0f} us, cached lookup {1e6 * warm:.1f} us")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,84 @@
+#!/usr/bin/env python3
+"""Measure cold and warm boot time-to-first-pixel of the display service
+
+Starts spotify_display_main.py's SpotifyDisplay in a fresh headless
+process, first with no snapshot (cold: startup animation) and then with the
+snapshot the cold run left behind (warm: last frame restored). Times run
+from spawning the process to the first frame reaching the panel and to
+the end of start-up, when polling can begin, so they include interpreter
+startup and imports. The Spotify token check is stubbed out; nothing is
+fetched from the network.
+
+    python tools/boot_timing.py --runs 5
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import tempfile
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Runs in the child. CLOCK_MONOTONIC is shared by every process, so the
+# parent can compare its spawn time with the child's first frame.
+CHILD = '''
+import json, sys, time
+import spotify_display_main as main
+main.SNAPSHOT_PATH = sys.argv[1]
+main.check_auth_token = lambda: True
+app = main.SpotifyDisplay()
+ready_at = time.monotonic()
+if not app.snapshot:
+    # Stand in for the album art a real run would have shown, then save
+    # the snapshot the next (warm) boot restores
+    from PIL import Image
+    art = Image.new('RGB', (64, 64), (200, 40, 90))
+    app.display.restore_frame(art.tobytes(), 'https://example.invalid/cover')
+    app.last_track = 'track'
+    app.save_snapshot()
+print(json.dumps({'first_frame_at': app.display.first_frame_at, 'ready_at': ready_at, 'warm': bool(app.snapshot)}))
+'''
+
+def boot(snapshot_path):
+    """Start one display process, returning (seconds to first pixel, seconds until ready to poll, warm)"""
+    # Keep the startup pack the cold boot renders out of the real cache
+    cache_dir = os.path.join(os.path.dirname(snapshot_path), 'cache')
+    env = dict(os.environ, SPOTIFY_MATRIX_OUTPUT='null', SPOTIFY_MATRIX_CACHE_DIR=cache_dir)
+    spawned = time.monotonic()
+    output = subprocess.run(
+        [sys.executable, '-c', CHILD, snapshot_path],
+        cwd=ROOT, env=env, capture_output=True, text=True, check=True
+    ).stdout
+    result = json.loads(output.strip().splitlines()[-1])
+    return result['first_frame_at'] - spawned, result['ready_at'] - spawned, result['warm']
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=3, help="Cold/warm pairs to time")
+    args = parser.parse_args()
+
+    timings = {False: [], True: []}
+    with tempfile.TemporaryDirectory() as workdir:
+        for _ in range(args.runs):
+            path = os.path.join(workdir, 'snapshot')
+            if os.path.exists(path):
+                os.remove(path)
+            for expected_warm in (False, True):
+                first_pixel, ready, warm = boot(path)
+                if warm != expected_warm:
+                    print(f"FAIL: expected a {'warm' if expected_warm else 'cold'} boot")
+                    return 1
+                timings[warm].append((first_pixel, ready))
+
+    for warm, label in ((False, 'cold'), (True, 'warm')):
+        first_pixel = [first for first, _ in timings[warm]]
+        ready = [ready for _, ready in timings[warm]]
+        print(f"{label} boot: first pixel {1000 * sum(first_pixel) / len(first_pixel):6.0f}ms, "
+              f"ready to poll {1000 * sum(ready) / len(ready):6.0f}ms (mean of {len(ready)})")
+    print("Cold boots also wait for the network before the first poll; warm boots don't.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""Replay a simulated day of listening through the idle monitor
+
+Compares idle mode against the old fixed 2 second polling: Spotify API
+calls, how long the panel and driver were idle, how long it took to notice
+playback resuming, and estimated CPU time. Driver loop CPU is measured on
+this machine against a real frame ring; poll CPU comes from --poll-cpu-ms
+(use the "ms CPU per poll" figure spotify.log reports hourly).
+
+    python tools/idle_trace.py --poll-cpu-ms 4
+"""
+import os
+import sys
+import time
+import argparse
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.idle import IdleMonitor
+from utils.frame_buffer import FrameRingReader, FrameRingWriter
+from config import (
+    PLAYBACK_POLL_INTERVAL,
+    IDLE_AFTER,
+    IDLE_POLL_MIN,
+    IDLE_POLL_MAX,
+    IDLE_DEVICE_POLL_INTERVAL,
+    WAKE_WINDOW,
+    FRAME_BUFFER_POLL_INTERVAL,
+    FRAME_BUFFER_IDLE_POLL_INTERVAL
+)
+
+HOUR = 3600
+
+# (start hour, end hour, state): "playing", "paused" (device connected) or
+# nothing at all outside these spans
+DAY = [
+    (7.0, 8.5, 'playing'),
+    (8.5, 8.75, 'paused'),
+    (12.0, 13.0, 'playing'),
+    (17.5, 19.0, 'playing'),
+    (19.0, 19.2, 'paused'),
+    (19.2, 21.0, 'playing'),
+    (21.0, 21.1, 'paused'),
+    (21.1, 22.5, 'playing'),
+]
+TRIGGERS = [15.0]  # Hours at which someone sends SIGUSR1
+
+class Playback:
+    """Just the field IdleMonitor looks at"""
+    def __init__(self, is_playing):
+        self.is_playing = is_playing
+
+PLAYING = Playback(True)
+PAUSED = Playback(False)
+
+def playback_at(t):
+    """Get the simulated playback at t seconds into the day"""
+    for start, end, state in DAY:
+        if start * HOUR <= t < end * HOUR:
+            return PLAYING if state == 'playing' else PAUSED
+    return None
+
+def resume_times():
+    """Times at which playback starts after not playing"""
+    times = []
+    for start, _, state in DAY:
+        if state == 'playing' and playback_at(start * HOUR - 1) is not PLAYING:
+            times.append(start * HOUR)
+    return times
+
+def replay(monitor=None, clock=None):
+    """Poll through the day, returning (poll times, idle seconds)
+
+    With no monitor this is the old fixed-interval loop. Otherwise `clock`
+    is the one-element list the monitor reads the time from.
+    """
+    t = 0.0
+    polls = []
+    idle_seconds = 0.0
+    triggers = [hour * HOUR for hour in TRIGGERS]
+    while t < 24 * HOUR:
+        polls.append(t)
+        if monitor is None:
+            t += PLAYBACK_POLL_INTERVAL
+            continue
+
+        clock[0] = t
+        monitor.update(playback_at(t))
+        next_poll = t + monitor.interval()
+        # A local trigger cuts the sleep short, as SIGUSR1 does
+        pending = [trigger for trigger in triggers if t < trigger <= next_poll]
+        if pending:
+            next_poll = pending[0]
+            monitor.wake()
+        if monitor.state == IdleMonitor.IDLE:
+            idle_seconds += min(next_poll, 24 * HOUR) - t
+        t = next_poll
+    return polls, idle_seconds
+
+def resume_latency(polls):
+    """Seconds between each resume and the first poll to see it"""
+    latencies = []
+    for resume in resume_times():
+        seen = next(t for t in polls if t >= resume)
+        latencies.append(seen - resume)
+    return latencies
+
+def driver_loop_cpu(interval, seconds=2.0):
+    """Measure the CPU fraction of the driver's wait loop at a given sleep interval"""
+    with tempfile.TemporaryDirectory() as workdir:
+        path = os.path.join(workdir, 'ring')
+        writer = FrameRingWriter(path)
+        reader = FrameRingReader(path)
+        started_cpu = time.process_time()
+        started = time.monotonic()
+        while time.monotonic() - started < seconds:
+            reader.idle()
+            reader.latest()
+            time.sleep(interval)
+        cpu = (time.process_time() - started_cpu) / (time.monotonic() - started)
+        reader.close()
+        writer.close()
+    return cpu
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--poll-cpu-ms', type=float, default=4.0, help="CPU milliseconds per playback poll")
+    parser.add_argument('--measure-seconds', type=float, default=2.0, help="How long to measure each driver loop")
+    args = parser.parse_args()
+
+    clock = [0.0]
+    monitor = IdleMonitor(
+        active_interval=PLAYBACK_POLL_INTERVAL,
+        idle_after=IDLE_AFTER,
+        idle_min_interval=IDLE_POLL_MIN,
+        idle_max_interval=IDLE_POLL_MAX,
+        device_interval=IDLE_DEVICE_POLL_INTERVAL,
+        wake_window=WAKE_WINDOW,
+        now=lambda: clock[0]
+    )
+    baseline_polls, _ = replay()
+    polls, idle_seconds = replay(monitor, clock)
+
+    active_cpu = driver_loop_cpu(FRAME_BUFFER_POLL_INTERVAL, args.measure_seconds)
+    idle_cpu = driver_loop_cpu(FRAME_BUFFER_IDLE_POLL_INTERVAL, args.measure_seconds)
+    day = 24 * HOUR
+    baseline_cpu = len(baseline_polls) * args.poll_cpu_ms / 1000 + day * active_cpu
+    idle_mode_cpu = len(polls) * args.poll_cpu_ms / 1000 + (day - idle_seconds) * active_cpu + idle_seconds * idle_cpu
+
+    latencies = resume_latency(polls)
+    baseline_latencies = resume_latency(baseline_polls)
+    playing = sum((end - start) * HOUR for start, end, state in DAY if state == 'playing')
+
+    print(f"Simulated day: {playing / HOUR:.1f}h playing, {len(resume_times())} resumes, {len(TRIGGERS)} local wake\n")
+    print(f"{'':22s} {'fixed 2s':>12s} {'idle mode':>12s}")
+    print(f"{'API calls':22s} {len(baseline_polls):12d} {len(polls):12d}  ({1 - len(polls) / len(baseline_polls):.0%} fewer)")
+    print(f"{'panel/driver idle':22s} {'0.0h':>12s} {idle_seconds / HOUR:11.1f}h")
+    print(f"{'resume latency mean':22s} {sum(baseline_latencies) / len(baseline_latencies):11.1f}s {sum(latencies) / len(latencies):11.1f}s")
+    print(f"{'resume latency max':22s} {max(baseline_latencies):11.1f}s {max(latencies):11.1f}s")
+    print(f"{'CPU seconds/day':22s} {baseline_cpu:12.0f} {idle_mode_cpu:12.0f}  ({1 - idle_mode_cpu / baseline_cpu:.0%} less)")
+    print(f"\nDriver wait loop: {100 * active_cpu:.2f}% CPU at {1000 * FRAME_BUFFER_POLL_INTERVAL:.0f}ms, "
+          f"{100 * idle_cpu:.3f}% at {1000 * FRAME_BUFFER_IDLE_POLL_INTERVAL:.0f}ms. "
+          f"The rgbmatrix refresh thread is not included; it keeps running (blanked) while idle.")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,112 @@
+#!/usr/bin/env python3
+"""Soak test: push thousands of simulated track changes through a headless display
+
+Runs DisplayManager with the "null" output, feeding it synthetic album art
+through the real download/resize/cache/fade path, and fails if resident
+memory keeps growing or frames leak out of the pool.
+
+    python tools/soak_display.py --tracks 5000
+"""
+import os
+import sys
+import time
+import logging
+import argparse
+import tempfile
+from io import BytesIO
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import requests
+from PIL import Image
+import display_manager
+from display_manager import DisplayManager
+from utils.art_cache import ArtCache
+
+def rss_bytes():
+    """Get this process's current resident set size"""
+    with open('/proc/self/statm') as f:
+        pages = int(f.read().split()[1])
+    return pages * os.sysconf('SC_PAGE_SIZE')
+
+class FakeResponse:
+    """Just enough of requests.Response for download_album_art"""
+    def __init__(self, content):
+        self.content = content
+        self.headers = {'content-type': 'image/jpeg'}
+
+    def raise_for_status(self):
+        pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+def make_album_art(index, size=640):
+    """Build a distinct JPEG the size Spotify serves"""
+    image = Image.new('RGB', (size, size), ((index * 37) % 256, (index * 91) % 256, (index * 53) % 256))
+    image.paste(((index * 11) % 256, 255 - index % 256, 128), (size // 4, size // 4, size * 3 // 4, size * 3 // 4))
+    with BytesIO() as buffer:
+        image.save(buffer, 'JPEG', quality=85)
+        image.close()
+        return buffer.getvalue()
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tracks', type=int, default=5000, help="Track changes to simulate")
+    parser.add_argument('--unique', type=int, default=500, help="Distinct album art URLs (the rest are cache hits)")
+    parser.add_argument('--warmup', type=int, default=200, help="Track changes before the baseline is taken")
+    parser.add_argument('--tolerance-mb', type=float, default=2.0, help="Allowed RSS growth after warmup")
+    parser.add_argument('--realtime', action='store_true', help="Keep animation sleeps (much slower)")
+    args = parser.parse_args()
+
+    logging.getLogger('display').setLevel(logging.WARNING)
+    logging.getLogger('art_cache').setLevel(logging.WARNING)
+
+    sources = [make_album_art(i) for i in range(16)]
+    requests.get = lambda url, timeout=None: FakeResponse(sources[hash(url) % len(sources)])
+    if not args.realtime:
+        display_manager.time.sleep = lambda seconds: None
+
+    with tempfile.TemporaryDirectory() as cache_dir:
+        display = DisplayManager(output='null')
+        display.art_cache = ArtCache(cache_dir=cache_dir)
+        pool_in_use = len(display.frames.in_use())
+
+        baseline = None
+        peak = 0
+        started = time.monotonic()
+        for i in range(args.tracks):
+            display.update_display(f"https://i.scdn.co/image/soak-{i % args.unique}")
+            if i % 97 == 96:
+                display.clear_display()  # Playback stopping now and then
+            if i % 500 == 0 and i:
+                display.display_text("Visit", large=True)
+
+            if i + 1 == args.warmup:
+                baseline = rss_bytes()
+            if baseline is not None and i % 250 == 0:
+                rss = rss_bytes()
+                peak = max(peak, rss)
+                print(f"{i:6d} tracks  RSS {rss / 1e6:7.2f} MB  (+{(rss - baseline) / 1e6:.2f} MB)")
+
+        elapsed = time.monotonic() - started
+        display.clear_display()
+        final = rss_bytes()
+        leaked_frames = len(display.frames.in_use()) - pool_in_use
+
+    growth = (max(peak, final) - baseline) / 1e6
+    print(f"{args.tracks} track changes in {elapsed:.1f}s ({args.tracks / elapsed:.0f}/s)")
+    print(f"RSS baseline {baseline / 1e6:.2f} MB, final {final / 1e6:.2f} MB, max growth {growth:.2f} MB")
+    print(f"Frames still checked out of the pool: {leaked_frames}")
+
+    if leaked_frames or growth > args.tolerance_mb:
+        print("FAIL: memory is not flat")
+        return 1
+    print("PASS")
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,121 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from io import BytesIO
+import requests
+from PIL import Image
+from utils.logger import setup_logger
+from utils.resample import draft, resize_frame
+from config import CACHE_DIR, RESIZE_TIER
+
+logger = setup_logger('art_cache', 'art_cache.log')
+
+FRAME_SIZE = (64, 64)
+FRAME_BYTES = FRAME_SIZE[0] * FRAME_SIZE[1] * 3  # Raw RGB888
+
+def decode_frame(content, tier=RESIZE_TIER):
+    """Decode an encoded image (JPEG, PNG, ...) into raw 64x64 RGB bytes"""
+    with BytesIO(content) as image_data:
+        with Image.open(image_data) as image:
+            draft(image, tier, FRAME_SIZE)
+            frame = resize_frame(image, tier, FRAME_SIZE)
+    data = frame.tobytes()
+    frame.close()
+    return data
+
+def fetch_frame(url, timeout=10, tier=RESIZE_TIER):
+    """Download album art and return it as raw 64x64 RGB bytes"""
+    response = requests.get(url, timeout=timeout)
+    response.raise_for_status()
+    return decode_frame(response.content, tier)
+
+class ArtCache:
+    def __init__(self, cache_dir=None, max_memory_entries=64):
+        """Album art frames keyed by URL, shared by every account in the process
+
+        Frames are kept as raw RGB bytes in a small in-memory LRU backed by
+        one file per URL on disk, so the same album is only downloaded once no
+        matter how many accounts or displays are showing it.
+        """
+        self.cache_dir = cache_dir or os.path.join(CACHE_DIR, 'art')
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+        except OSError as e:
+            # e.g. cache/ left owned by root from when the display ran under
+            # sudo: carry on memory-only rather than failing to start
+            logger.error(f"Can't create art cache directory {self.cache_dir}, caching in memory only: {e}")
+        self.max_memory_entries = max_memory_entries
+        self._frames = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+
+    def _path(self, url):
+        """Get the on-disk location for a URL"""
+        name = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        return os.path.join(self.cache_dir, f"{name}.rgb")
+
+    def _remember(self, url, data):
+        """Store a frame in the in-memory LRU (caller holds the lock)"""
+        self._frames[url] = data
+        self._frames.move_to_end(url)
+        while len(self._frames) > self.max_memory_entries:
+            self._frames.popitem(last=False)
+
+    def contains(self, url):
+        """Check whether a URL is cached, without reading it"""
+        with self._lock:
+            if url in self._frames:
+                return True
+        return os.path.exists(self._path(url))
+
+    def disk_usage(self):
+        """Get (entry count, total bytes) of the on-disk cache"""
+        count = 0
+        total = 0
+        with os.scandir(self.cache_dir) as entries:
+            for entry in entries:
+                if entry.name.endswith('.rgb'):
+                    count += 1
+                    total += entry.stat().st_size
+        return count, total
+
+    def get(self, url):
+        """Return a cached frame without touching the network, or None"""
+        with self._lock:
+            data = self._frames.get(url)
+            if data is not None:
+                self._frames.move_to_end(url)
+                self.hits += 1
+                return data
+
+        try:
+            with open(self._path(url), 'rb') as f:
+                data = f.read()
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.error(f"Error reading cached art for {url}: {e}")
+            return None
+
+        if len(data) != FRAME_BYTES:
+            logger.warning(f"Discarding truncated cache entry for {url}")
+            return None
+
+        with self._lock:
+            self._remember(url, data)
+            self.hits += 1
+        return data
+
+    def put(self, url, data):
+        """Store a frame in memory and on disk"""
+        with self._lock:
+            self._remember(url, data)
+        path = self._path(url)
+        tmp_path = f"{path}.tmp"
+        try:
+            with open(tmp_path, 'wb') as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+        except Exception as e:
+            logger.error(f"Error writing cached art for {url}: {e}")
@@ -0,0 +1,128 @@
+import os
+import threading
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor, wait, FIRST_COMPLETED
+from concurrent.futures.process import BrokenProcessPool
+from utils.logger import setup_logger
+from utils.art_cache import ArtCache, decode_frame, fetch_frame
+from config import RESIZE_TIER
+
+logger = setup_logger('art_pipeline', 'art_pipeline.log')
+
+def _process_job(source, tier):
+    """Worker: turn a URL or encoded image bytes into raw 64x64 RGB bytes"""
+    if isinstance(source, str):
+        return fetch_frame(source, tier=tier)
+    return decode_frame(source, tier)
+
+class ArtPipeline:
+    def __init__(self, art_cache=None, workers=None, tier=RESIZE_TIER):
+        """Download, decode and resize album art on a pool of worker processes
+
+        Decoding and resizing are CPU bound and hold the GIL, so threads
+        can't use more than one core; worker processes use them all. Each
+        finished frame is written to the art cache from this process as it
+        arrives. The pool starts on first use and is reused until close().
+        """
+        self.art_cache = art_cache or ArtCache()
+        self.workers = workers or os.cpu_count() or 1
+        self.tier = tier
+        self._pool = None
+        self._pending = {}  # Cache key -> Future, so duplicate submissions share one job
+        self._lock = threading.Lock()
+        self.completed = 0
+        self.failed = 0
+
+    def _executor(self):
+        """Get the process pool, starting it if needed (caller holds the lock)"""
+        if self._pool is None:
+            # forkserver rather than fork: the display process may be
+            # running matrix or network threads that fork would copy
+            # mid-operation
+            context = multiprocessing.get_context('forkserver')
+            self._pool = ProcessPoolExecutor(max_workers=self.workers, mp_context=context)
+            logger.info(f"Started art pipeline with {self.workers} worker processes ({self.tier} resize)")
+        return self._pool
+
+    def submit(self, item):
+        """Queue one URL, or a (key, image bytes) pair, for processing
+
+        Returns a Future whose result is the raw frame bytes. The frame is
+        cached as soon as it completes; failures are logged and re-raised
+        from result(). If a worker has died the pool is discarded and
+        BrokenProcessPool raised; the next submit starts a fresh one.
+        """
+        key, source = (item, item) if isinstance(item, str) else item
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            pool = self._executor()
+            try:
+                future = pool.submit(_process_job, source, self.tier)
+            except BrokenProcessPool:
+                logger.warning("Art pipeline workers died (out of memory?), restarting the pool on next use")
+                self._pool = None
+                pool.shutdown(wait=False)
+                raise
+            self._pending[key] = future
+        future.add_done_callback(lambda done: self._finish(key, done))
+        return future
+
+    def _finish(self, key, future):
+        """Cache a completed job's frame, or log why it failed"""
+        with self._lock:
+            self._pending.pop(key, None)
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            logger.error(f"Error processing album art {key}: {error}")
+            with self._lock:
+                self.failed += 1
+            return
+        self.art_cache.put(key, future.result())
+        with self._lock:
+            self.completed += 1
+
+    def process(self, items, skip_cached=True):
+        """Process many URLs or (key, image bytes) pairs, yielding (key, frame bytes) as each completes
+
+        Failed items yield (key, None), including those lost when a worker
+        dies. Keys already in the cache are skipped
+        without yielding. At most twice the worker count are queued at once,
+        so a large import streams from disk rather than loading every image
+        into memory first.
+        """
+        in_flight = {}
+        items = iter(items)
+        exhausted = False
+
+        while in_flight or not exhausted:
+            while not exhausted and len(in_flight) < self.workers * 2:
+                try:
+                    item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                key = item if isinstance(item, str) else item[0]
+                if skip_cached and self.art_cache.contains(key):
+                    continue
+                try:
+                    in_flight[self.submit(item)] = key
+                except BrokenProcessPool:
+                    yield key, None
+
+            if not in_flight:
+                continue
+            done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in done:
+                key = in_flight.pop(future)
+                yield key, (future.result() if future.exception() is None else None)
+
+    def close(self):
+        """Stop the worker processes, waiting for queued jobs"""
+        with self._lock:
+            pool, self._pool = self._pool, None
+        if pool is not None:
+            pool.shutdown(wait=True)
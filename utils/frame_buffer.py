@@ -0,0 +1,190 @@
+import os
+import mmap
+import time
+import struct
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger('frame_buffer', 'frame_buffer.log')
+
+# Ring buffer layout, shared between the producer and the matrix driver:
+#   header: magic, version, width, height, slot count, latest frame number,
+#           flags (FLAG_IDLE: nothing to show, the driver may pause)
+#   slots:  sequence, publish time (CLOCK_MONOTONIC ns), RGB888 pixels
+# Each slot is a seqlock. The producer marks a slot odd while writing and
+# even once the frame is complete, then bumps the header's frame number.
+# The reader copies a frame into its preallocated image and rechecks the
+# sequence afterwards, so neither side ever takes a lock or blocks the other.
+MAGIC = b'SMRB'
+VERSION = 2
+HEADER = struct.Struct('<4sIHHIQI4x')
+LATEST_OFFSET = 16  # Offset of the frame number within HEADER
+FLAGS_OFFSET = 24  # Offset of the flags within HEADER
+FLAG_IDLE = 1
+SLOT_HEADER = struct.Struct('<QQ')
+DEFAULT_SLOTS = 4
+
+def _slot_size(width, height):
+    """Get the size of one slot including its header"""
+    return SLOT_HEADER.size + width * height * 3
+
+def open_ring(path, width=64, height=64, slots=DEFAULT_SLOTS):
+    """Open (creating if needed) the shared ring buffer and map it"""
+    size = HEADER.size + slots * _slot_size(width, height)
+    # The driver runs as root and the producer does not, so keep it world writable
+    old_umask = os.umask(0)
+    try:
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o666)
+    finally:
+        os.umask(old_umask)
+
+    try:
+        if os.fstat(fd).st_size < size:
+            os.ftruncate(fd, size)
+        mm = mmap.mmap(fd, size)
+    finally:
+        os.close(fd)
+
+    magic, version, w, h, count, _, _ = HEADER.unpack_from(mm, 0)
+    if magic != MAGIC or version != VERSION or (w, h, count) != (width, height, slots):
+        logger.info(f"Initializing frame ring at {path} ({slots} slots of {width}x{height})")
+        mm[:size] = bytes(size)
+        HEADER.pack_into(mm, 0, MAGIC, VERSION, width, height, slots, 0, 0)
+    return mm
+
+class FrameRingWriter:
+    def __init__(self, path, width=64, height=64, slots=DEFAULT_SLOTS):
+        """Publish frames into the shared ring buffer"""
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.frame_bytes = width * height * 3
+        self.mm = open_ring(path, width, height, slots)
+        self.frame_number = struct.unpack_from('<Q', self.mm, LATEST_OFFSET)[0]
+        # The flags describe the producer that set them. A new one starts
+        # awake, so an idle flag left by one that went idle and then
+        # restarted mustn't keep the driver paused.
+        self.set_idle(False)
+
+    def publish(self, image):
+        """Write an RGB image into the next slot and make it visible"""
+        number = self.frame_number + 1
+        offset = HEADER.size + ((number - 1) % self.slots) * _slot_size(self.width, self.height)
+        data_offset = offset + SLOT_HEADER.size
+
+        SLOT_HEADER.pack_into(self.mm, offset, 2 * number - 1, 0)  # Odd: write in progress
+        self.mm[data_offset:data_offset + self.frame_bytes] = image.tobytes()
+        SLOT_HEADER.pack_into(self.mm, offset, 2 * number, time.monotonic_ns())
+        struct.pack_into('<Q', self.mm, LATEST_OFFSET, number)
+        self.frame_number = number
+        return number
+
+    def set_idle(self, idle):
+        """Tell the driver whether it can pause until there is something to show"""
+        struct.pack_into('<I', self.mm, FLAGS_OFFSET, FLAG_IDLE if idle else 0)
+
+    def close(self):
+        """Unmap the ring"""
+        self.mm.close()
+
+class FrameRingReader:
+    def __init__(self, path, width=64, height=64, slots=DEFAULT_SLOTS):
+        """Read the newest frame out of the shared ring buffer"""
+        self.width = width
+        self.height = height
+        self.slots = slots
+        self.frame_bytes = width * height * 3
+        self.mm = open_ring(path, width, height, slots)
+        self.torn_reads = 0
+
+    def latest(self):
+        """Get the number of the newest published frame (0 if none yet)"""
+        return struct.unpack_from('<Q', self.mm, LATEST_OFFSET)[0]
+
+    def idle(self):
+        """Check whether the producer has nothing to show"""
+        return bool(struct.unpack_from('<I', self.mm, FLAGS_OFFSET)[0] & FLAG_IDLE)
+
+    def read_into(self, image, number):
+        """Copy frame `number` into a preallocated RGB image
+
+        Returns the frame's publish time in monotonic nanoseconds, or None if
+        the producer overwrote the slot while we were reading it.
+        """
+        offset = HEADER.size + ((number - 1) % self.slots) * _slot_size(self.width, self.height)
+        data_offset = offset + SLOT_HEADER.size
+
+        sequence, published = SLOT_HEADER.unpack_from(self.mm, offset)
+        if sequence != 2 * number:
+            self.torn_reads += 1
+            return None
+
+        image.frombytes(self.mm[data_offset:data_offset + self.frame_bytes])
+
+        if SLOT_HEADER.unpack_from(self.mm, offset)[0] != sequence:
+            self.torn_reads += 1
+            return None
+        return published
+
+    def close(self):
+        """Unmap the ring"""
+        self.mm.close()
+
+class SharedFrameCanvas:
+    def __init__(self, width, height):
+        """Stand-in for an rgbmatrix FrameCanvas that lives in the producer"""
+        self.width = width
+        self.height = height
+        self.image = Image.new('RGB', (width, height))
+
+    def SetImage(self, image, offset_x=0, offset_y=0):
+        """Copy an image onto the canvas (callers may close theirs afterwards)"""
+        if image.mode != 'RGB':
+            image = image.convert('RGB')
+        self.image.paste(image, (offset_x, offset_y))
+
+    def Clear(self):
+        """Blank the canvas"""
+        self.image.paste((0, 0, 0), (0, 0, self.width, self.height))
+
+class SharedFrameMatrix:
+    def __init__(self, path, width=64, height=64, stats_interval=60):
+        """Stand-in for RGBMatrix that hands frames to the driver process
+
+        Exposes the subset of the RGBMatrix API DisplayManager uses, so the
+        unprivileged producer can run the same drawing code it always has.
+        """
+        self.writer = FrameRingWriter(path, width, height)
+        self.width = width
+        self.height = height
+        self.stats_interval = stats_interval
+        self._published = 0
+        self._stats_started = time.monotonic()
+        self._cpu_started = time.process_time()
+
+    def CreateFrameCanvas(self):
+        """Create an offscreen canvas"""
+        return SharedFrameCanvas(self.width, self.height)
+
+    def set_idle(self, idle):
+        """Let the driver pause while there is nothing to show"""
+        self.writer.set_idle(idle)
+
+    def SwapOnVSync(self, canvas):
+        """Publish the canvas and hand back a canvas to draw the next frame on"""
+        self.writer.publish(canvas.image)
+        self._published += 1
+        self._log_stats()
+        return canvas
+
+    def _log_stats(self):
+        """Periodically log frame rate and producer CPU usage"""
+        now = time.monotonic()
+        elapsed = now - self._stats_started
+        if elapsed < self.stats_interval:
+            return
+        cpu = time.process_time() - self._cpu_started
+        logger.info(f"Producer: {self._published} frames published in {elapsed:.0f}s, CPU {100 * cpu / elapsed:.1f}%")
+        self._published = 0
+        self._stats_started = now
+        self._cpu_started = time.process_time()
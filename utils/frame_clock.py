@@ -0,0 +1,116 @@
+import math
+import time
+from collections import deque
+from utils.logger import setup_logger
+
+logger = setup_logger('frame_clock', 'frame_clock.log')
+
+class FrameStats:
+    def __init__(self, history=1000):
+        """Lateness record for presented frames
+
+        Lateness is how long after its deadline a frame actually reached the
+        panel. Only the most recent `history` samples are kept.
+        """
+        self.frames = 0
+        self.late = 0
+        self.skipped = 0
+        self.max_lateness = 0
+        self._total = 0
+        self._total_squared = 0
+        self.lateness = deque(maxlen=history)
+
+    def record(self, lateness, late):
+        """Record one presented frame"""
+        self.frames += 1
+        self.late += late
+        self.max_lateness = max(self.max_lateness, lateness)
+        self._total += lateness
+        self._total_squared += lateness * lateness
+        self.lateness.append(lateness)
+
+    def merge(self, other):
+        """Fold another set of stats into this one"""
+        self.frames += other.frames
+        self.late += other.late
+        self.skipped += other.skipped
+        self.max_lateness = max(self.max_lateness, other.max_lateness)
+        self._total += other._total
+        self._total_squared += other._total_squared
+        self.lateness.extend(other.lateness)
+
+    @property
+    def mean_lateness(self):
+        """Average seconds frames were presented after their deadline"""
+        return self._total / self.frames if self.frames else 0
+
+    @property
+    def jitter(self):
+        """Standard deviation of lateness in seconds"""
+        if not self.frames:
+            return 0
+        mean = self.mean_lateness
+        return math.sqrt(max(0, self._total_squared / self.frames - mean * mean))
+
+    def summary(self):
+        """Describe the stats in one line"""
+        return (f"{self.frames} frames, {self.late} late, {self.skipped} skipped, "
+                f"lateness mean {1000 * self.mean_lateness:.1f}ms max {1000 * self.max_lateness:.1f}ms, "
+                f"jitter {1000 * self.jitter:.1f}ms")
+
+class FrameClock:
+    def __init__(self, swap, refresh_rate_hz=100, sleep=None, now=None):
+        """Shared clock that paces every animation against absolute deadlines
+
+        Frame i of an animation is due at start + i / fps, so render time
+        never accumulates into drift. When rendering falls more than a frame
+        behind, frames are skipped to catch up. swap() is expected to block
+        until the next vsync, so the clock wakes half a refresh period
+        before each deadline and lets the swap land on it. Swaps can only
+        land on a refresh, so a frame only counts as late once it misses
+        the refresh it was aiming for.
+        """
+        self.swap = swap
+        self.refresh_period = 1.0 / refresh_rate_hz if refresh_rate_hz else 0
+        self.vsync_margin = self.refresh_period / 2
+        self.sleep = sleep or time.sleep
+        self.now = now or time.monotonic
+        self.stats = FrameStats()
+
+    def wait_until(self, deadline):
+        """Sleep until an absolute clock time"""
+        remaining = deadline - self.now()
+        if remaining > 0:
+            self.sleep(remaining)
+
+    def hold(self, seconds, since=None):
+        """Keep the current frame up until `seconds` after `since` (default now)"""
+        self.wait_until((self.now() if since is None else since) + seconds)
+
+    def play(self, count, fps, render):
+        """Run an animation of `count` frames at `fps`
+
+        render(i) draws frame i onto the offscreen canvas; the clock decides
+        when to swap it in. Returns the FrameStats for this animation.
+        """
+        stats = FrameStats()
+        interval = 1.0 / fps
+        late_after = max(interval / 2, self.refresh_period)
+        start = self.now()
+
+        for i in range(count):
+            deadline = start + i * interval
+            # Skip frames whose successor is already due, but always show the last
+            if i < count - 1 and self.now() > deadline + interval:
+                stats.skipped += 1
+                continue
+
+            render(i)
+            self.wait_until(deadline - self.vsync_margin)
+            self.swap()
+            lateness = max(0, self.now() - deadline)
+            stats.record(lateness, lateness > late_after)
+
+        self.stats.merge(stats)
+        logger.debug(f"Animation at {fps:.0f}fps: {stats.summary()}")
+        return stats
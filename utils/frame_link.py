@@ -0,0 +1,128 @@
+import socket
+import struct
+import socketserver
+from utils.logger import setup_logger
+from utils.art_cache import FRAME_BYTES
+
+logger = setup_logger('frame_link', 'frame_link.log')
+
+# Wire format: 4 byte magic, 1 byte message kind, 4 byte payload length, payload
+MAGIC = b'SMF1'
+HEADER = struct.Struct('!4sBI')
+KIND_FRAME = 1  # Payload is a raw 64x64 RGB888 frame
+KIND_CLEAR = 2  # No payload, blank the display
+
+def parse_address(address, default_port):
+    """Split 'host[:port]' into a (host, port) tuple"""
+    host, _, port = address.partition(':')
+    return host, int(port) if port else default_port
+
+def _recv_exact(sock, size):
+    """Read exactly size bytes, or return None if the peer disconnected"""
+    buffer = bytearray(size)
+    view = memoryview(buffer)
+    received = 0
+    while received < size:
+        count = sock.recv_into(view[received:])
+        if not count:
+            return None
+        received += count
+    return bytes(buffer)
+
+class FrameSender:
+    def __init__(self, address, timeout=5):
+        """Push frames to one display node over TCP
+
+        The connection is opened lazily and re-established on the next send
+        after any error. The last message is replayed on reconnect so a node
+        that restarted picks up the current frame straight away.
+        """
+        self.address = address
+        self.timeout = timeout
+        self.sock = None
+        self._last_message = None
+
+    def _connect(self):
+        """Open the connection to the node"""
+        self.sock = socket.create_connection(self.address, timeout=self.timeout)
+        self.sock.setsockopt(socket.IPPROTO_TCP, socket.TCP_NODELAY, 1)
+        logger.info(f"Connected to display node {self.address[0]}:{self.address[1]}")
+
+    def _send(self, message):
+        """Send a message, reconnecting (and replaying the last one) if needed"""
+        self._last_message = message
+        try:
+            if not self.sock:
+                self._connect()
+            self.sock.sendall(message)
+            return True
+        except OSError as e:
+            logger.warning(f"Failed to send to {self.address[0]}:{self.address[1]}: {e}")
+            self.close()
+            return False
+
+    def send_frame(self, data):
+        """Send a raw RGB frame"""
+        return self._send(HEADER.pack(MAGIC, KIND_FRAME, len(data)) + data)
+
+    def send_clear(self):
+        """Tell the node to blank its display"""
+        return self._send(HEADER.pack(MAGIC, KIND_CLEAR, 0))
+
+    def resend(self):
+        """Replay the last message, used to retry nodes that were unreachable"""
+        if self._last_message and not self.sock:
+            return self._send(self._last_message)
+        return True
+
+    def close(self):
+        """Drop the connection"""
+        if self.sock:
+            try:
+                self.sock.close()
+            except OSError:
+                pass
+        self.sock = None
+
+class _FrameHandler(socketserver.BaseRequestHandler):
+    def handle(self):
+        """Read messages from the hub until it disconnects"""
+        peer = f"{self.client_address[0]}:{self.client_address[1]}"
+        logger.info(f"Hub connected from {peer}")
+        while True:
+            header = _recv_exact(self.request, HEADER.size)
+            if header is None:
+                break
+            magic, kind, length = HEADER.unpack(header)
+            if magic != MAGIC:
+                logger.error(f"Bad frame header from {peer}, dropping connection")
+                break
+            # Check the length before allocating for it, so a bogus header
+            # can't make us buffer up to 4 GiB
+            if length not in (0, FRAME_BYTES):
+                logger.error(f"Bad payload length {length} from {peer}, dropping connection")
+                break
+            payload = _recv_exact(self.request, length) if length else b''
+            if payload is None:
+                break
+
+            try:
+                if kind == KIND_FRAME:
+                    self.server.on_frame(payload)
+                elif kind == KIND_CLEAR:
+                    self.server.on_clear()
+                else:
+                    logger.warning(f"Ignoring unknown message kind {kind} from {peer}")
+            except Exception as e:
+                logger.error(f"Error handling message from hub: {e}", exc_info=True)
+        logger.info(f"Hub {peer} disconnected")
+
+class FrameServer(socketserver.ThreadingTCPServer):
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, port, on_frame, on_clear, host='0.0.0.0'):
+        """Receive frames from a fleet hub and hand them to callbacks"""
+        self.on_frame = on_frame
+        self.on_clear = on_clear
+        super().__init__((host, port), _FrameHandler)
@@ -0,0 +1,239 @@
+import os
+import mmap
+import zlib
+import struct
+import numpy as np
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger('frame_pack', 'frame_pack.log')
+
+# Pack file layout:
+#   header: magic, version, pixel format, width, height, index offset, index count
+#   frames: raw pixels, each starting on a FRAME_ALIGN boundary
+#   index:  per frame (offset, length, crc32, key length) followed by the key
+# Appending writes new frames and a new index after the old one, then
+# rewrites the header last, so a crash mid-append leaves the previous pack
+# intact. Superseded frames and stale indexes are reclaimed by compact().
+MAGIC = b'SMPK'
+VERSION = 1
+HEADER = struct.Struct('<4sHBxHHQI8x')
+INDEX_ENTRY = struct.Struct('<QIIH')
+FRAME_ALIGN = 16
+
+RGB888 = 0
+RGB565 = 1
+BYTES_PER_PIXEL = {RGB888: 3, RGB565: 2}
+
+class FramePackError(Exception):
+    """Raised when a pack file is missing, truncated or corrupt"""
+
+def to_rgb565(frame):
+    """Pack an (h, w, 3) uint8 array into (h, w) little-endian RGB565"""
+    frame = frame.astype(np.uint16)
+    return ((frame[..., 0] >> 3) << 11 | (frame[..., 1] >> 2) << 5 | (frame[..., 2] >> 3)).astype('<u2')
+
+def from_rgb565(frame):
+    """Expand an (h, w) RGB565 array to (h, w, 3) uint8, replicating the high bits"""
+    r = (frame >> 11) & 0x1f
+    g = (frame >> 5) & 0x3f
+    b = frame & 0x1f
+    return np.dstack(((r << 3) | (r >> 2), (g << 2) | (g >> 4), (b << 3) | (b >> 2))).astype(np.uint8)
+
+def _as_array(frame, width, height):
+    """Accept a PIL image, numpy array or raw RGB bytes and return (h, w, 3) uint8"""
+    if isinstance(frame, Image.Image):
+        if frame.mode != 'RGB':
+            frame = frame.convert('RGB')
+        array = np.asarray(frame)
+    elif isinstance(frame, (bytes, bytearray, memoryview)):
+        array = np.frombuffer(frame, dtype=np.uint8).reshape(height, width, 3)
+    else:
+        array = np.asarray(frame, dtype=np.uint8)
+    if array.shape != (height, width, 3):
+        raise ValueError(f"Expected a {width}x{height} RGB frame, got shape {array.shape}")
+    return array
+
+def _read_index(data, offset, count):
+    """Parse the index into {key: (offset, length, crc32)}"""
+    entries = {}
+    for _ in range(count):
+        frame_offset, length, crc, key_length = INDEX_ENTRY.unpack_from(data, offset)
+        offset += INDEX_ENTRY.size
+        key = bytes(data[offset:offset + key_length]).decode('utf-8')
+        offset += key_length
+        entries[key] = (frame_offset, length, crc)  # Later entries win
+    return entries
+
+class FramePackReader:
+    def __init__(self, path):
+        """Memory-map a pack file for zero-copy frame access"""
+        self.path = path
+        with open(path, 'rb') as f:
+            try:
+                self.mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except ValueError:
+                raise FramePackError(f"{path} is empty")
+
+        if len(self.mm) < HEADER.size:
+            self.mm.close()
+            raise FramePackError(f"{path} is truncated")
+        magic, version, self.pixel_format, self.width, self.height, index_offset, index_count = HEADER.unpack_from(self.mm, 0)
+        if magic != MAGIC or version != VERSION:
+            self.mm.close()
+            raise FramePackError(f"{path} is not a version {VERSION} frame pack")
+
+        try:
+            self.entries = _read_index(self.mm, index_offset, index_count)
+        except (struct.error, UnicodeDecodeError) as e:
+            self.mm.close()
+            raise FramePackError(f"{path} has a corrupt index: {e}")
+        self.frame_bytes = self.width * self.height * BYTES_PER_PIXEL[self.pixel_format]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+        return False
+
+    def __contains__(self, key):
+        return key in self.entries
+
+    def __len__(self):
+        return len(self.entries)
+
+    def keys(self):
+        """Get every frame key in the pack"""
+        return list(self.entries)
+
+    def frame(self, key):
+        """Get a zero-copy view of a frame straight out of the mapped file
+
+        RGB888 packs give (h, w, 3) uint8 views; RGB565 packs give (h, w)
+        uint16 views (see from_rgb565). Views are only valid until close().
+        """
+        offset, length, _ = self.entries[key]
+        if self.pixel_format == RGB888:
+            return np.frombuffer(self.mm, dtype=np.uint8, count=length, offset=offset).reshape(self.height, self.width, 3)
+        return np.frombuffer(self.mm, dtype='<u2', count=length // 2, offset=offset).reshape(self.height, self.width)
+
+    def rgb(self, key):
+        """Get a frame as (h, w, 3) RGB888, converting RGB565 packs"""
+        frame = self.frame(key)
+        return frame if self.pixel_format == RGB888 else from_rgb565(frame)
+
+    def load_into(self, image, key):
+        """Copy a frame into an existing RGB image (e.g. a pooled frame)"""
+        image.frombytes(self.rgb(key))
+        return image
+
+    def verify(self):
+        """Check every frame against its CRC, returning the keys that fail"""
+        bad = []
+        for key, (offset, length, crc) in self.entries.items():
+            if offset + length > len(self.mm) or length != self.frame_bytes:
+                bad.append(key)
+            elif zlib.crc32(self.mm[offset:offset + length]) != crc:
+                bad.append(key)
+        return bad
+
+    def close(self):
+        """Unmap the pack"""
+        self.mm.close()
+
+class FramePackWriter:
+    def __init__(self, path, width=64, height=64, pixel_format=RGB888):
+        """Append frames to a pack, creating it if it doesn't exist
+
+        Frames become visible to new readers once commit() runs (or the
+        writer is used as a context manager and exits cleanly).
+        """
+        self.path = path
+        self.width = width
+        self.height = height
+        self.pixel_format = pixel_format
+        self.entries = {}
+
+        if os.path.exists(path) and os.path.getsize(path) >= HEADER.size:
+            with FramePackReader(path) as existing:
+                if (existing.width, existing.height, existing.pixel_format) != (width, height, pixel_format):
+                    raise FramePackError(f"{path} holds {existing.width}x{existing.height} frames in format {existing.pixel_format}")
+                self.entries = dict(existing.entries)
+            self.file = open(path, 'r+b')
+            self.file.seek(0, os.SEEK_END)
+        else:
+            self.file = open(path, 'w+b')
+            self.file.write(HEADER.pack(MAGIC, VERSION, pixel_format, width, height, 0, 0))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, *exc):
+        if exc_type is None:
+            self.commit()
+        self.file.close()
+        return False
+
+    def _align(self):
+        """Pad the file so the next frame starts on an aligned offset"""
+        padding = -self.file.tell() % FRAME_ALIGN
+        if padding:
+            self.file.write(bytes(padding))
+
+    def add(self, key, frame):
+        """Append one frame (PIL image, numpy array or raw RGB bytes)"""
+        array = _as_array(frame, self.width, self.height)
+        self.add_raw(key, (array if self.pixel_format == RGB888 else to_rgb565(array)).tobytes())
+
+    def add_raw(self, key, data):
+        """Append one frame already encoded in this pack's pixel format"""
+        self._align()
+        offset = self.file.tell()
+        self.file.write(data)
+        self.entries[key] = (offset, len(data), zlib.crc32(data))
+
+    def commit(self):
+        """Write the index and publish it by rewriting the header"""
+        self.file.seek(0, os.SEEK_END)
+        index_offset = self.file.tell()
+        for key, (offset, length, crc) in self.entries.items():
+            encoded = key.encode('utf-8')
+            self.file.write(INDEX_ENTRY.pack(offset, length, crc, len(encoded)))
+            self.file.write(encoded)
+        self.file.flush()
+        os.fsync(self.file.fileno())
+
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, VERSION, self.pixel_format, self.width, self.height, index_offset, len(self.entries)))
+        self.file.flush()
+        os.fsync(self.file.fileno())
+        self.file.seek(0, os.SEEK_END)
+
+    def close(self):
+        """Close without committing frames added since the last commit"""
+        self.file.close()
+
+def compact(path):
+    """Rewrite a pack with only its live frames, dropping superseded data
+
+    Frames that fail their CRC are dropped too. Returns the bytes reclaimed.
+    """
+    before = os.path.getsize(path)
+    tmp_path = f"{path}.compact"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)  # Left over from an interrupted compaction
+    with FramePackReader(path) as reader:
+        bad = set(reader.verify())
+        if bad:
+            logger.warning(f"Dropping {len(bad)} corrupt frames from {path}")
+        with FramePackWriter(tmp_path, reader.width, reader.height, reader.pixel_format) as writer:
+            for key in reader.keys():
+                if key in bad:
+                    continue
+                offset, length, _ = reader.entries[key]
+                writer.add_raw(key, reader.mm[offset:offset + length])
+    os.replace(tmp_path, path)
+    after = os.path.getsize(path)
+    logger.info(f"Compacted {path}: {before} -> {after} bytes")
+    return before - after
@@ -0,0 +1,46 @@
+from PIL import Image
+from utils.logger import setup_logger
+
+logger = setup_logger('frame_pool', 'frame_pool.log')
+
+class FramePool:
+    def __init__(self, size=(64, 64), count=4, mode='RGB'):
+        """Fixed set of preallocated frames with explicit ownership
+
+        Frames are allocated once and recycled for the life of the process:
+        acquire() hands one out and records who holds it, release() takes it
+        back. Running out means some code path forgot to release, so it is
+        reported loudly instead of silently allocating more.
+        """
+        self.size = size
+        self.mode = mode
+        self._free = [Image.new(mode, size) for _ in range(count)]
+        self._owners = {}  # id(frame) -> (frame, owner description)
+
+    def acquire(self, owner):
+        """Check a frame out of the pool; its contents are undefined"""
+        if not self._free:
+            held = ', '.join(description for _, description in self._owners.values())
+            raise RuntimeError(f"Frame pool exhausted, frames held by: {held}")
+        frame = self._free.pop()
+        self._owners[id(frame)] = (frame, owner)
+        return frame
+
+    def release(self, frame):
+        """Return a frame to the pool"""
+        if self._owners.pop(id(frame), None) is None:
+            raise ValueError("Released a frame that is not checked out of this pool")
+        self._free.append(frame)
+
+    def in_use(self):
+        """Get the owner descriptions of every checked-out frame"""
+        return [owner for _, owner in self._owners.values()]
+
+    def close(self):
+        """Free every frame's pixel memory"""
+        for frame in self._free:
+            frame.close()
+        for frame, _ in self._owners.values():
+            frame.close()
+        self._free = []
+        self._owners = {}
@@ -0,0 +1,82 @@
+import time
+from utils.logger import setup_logger
+
+logger = setup_logger('idle', 'idle.log')
+
+class IdleMonitor:
+    ACTIVE = 'active'
+    IDLE = 'idle'
+
+    def __init__(self, active_interval=2.0, idle_after=300.0, idle_min_interval=15.0,
+                 idle_max_interval=300.0, device_interval=15.0, wake_window=120.0, now=None):
+        """Decide how often to poll Spotify and whether the panel can sleep
+
+        Polls every active_interval while music plays and for idle_after
+        seconds after it stops. Then the display goes idle and the interval
+        doubles from idle_min_interval up to idle_max_interval. While a
+        device is still connected but paused, the interval is held at
+        device_interval, since playback is one tap away. wake() is the
+        local trigger (SIGUSR1): it polls straight away and stays active
+        for wake_window seconds.
+        """
+        self.active_interval = active_interval
+        self.idle_after = idle_after
+        self.idle_min_interval = idle_min_interval
+        self.idle_max_interval = idle_max_interval
+        self.device_interval = device_interval
+        self.wake_window = wake_window
+        self.now = now or time.monotonic
+        self.state = self.ACTIVE
+        self.active_until = self.now() + idle_after
+        self.idle_polls = 0  # Empty polls since going idle
+        self.device_connected = False
+        self.wake_requested = False
+
+    def wake(self):
+        """Request a prompt poll (safe to call from a signal handler)"""
+        self.wake_requested = True
+
+    def update(self, playback):
+        """Feed in the latest PlaybackState (or None), returning True if the state changed"""
+        now = self.now()
+        if self.wake_requested:
+            self.wake_requested = False
+            self.active_until = max(self.active_until, now + self.wake_window)
+            logger.info("Woken by local trigger")
+
+        if playback is not None and playback.is_playing:
+            self.active_until = now + self.idle_after
+        self.device_connected = playback is not None
+
+        previous = self.state
+        self.state = self.ACTIVE if now < self.active_until else self.IDLE
+        if self.state == self.IDLE:
+            self.idle_polls = min(self.idle_polls + 1, 16) if previous == self.IDLE else 0
+        if self.state != previous:
+            logger.info(f"Display {self.state}")
+        return self.state != previous
+
+    def snapshot(self):
+        """Get the monitor's state as a JSON-friendly dict"""
+        return {
+            'state': self.state,
+            'active_for': max(0, self.active_until - self.now()),
+            'idle_polls': self.idle_polls,
+            'device_connected': self.device_connected
+        }
+
+    def restore(self, state, elapsed=0):
+        """Resume from snapshot() taken `elapsed` seconds ago, e.g. before a restart"""
+        self.state = state.get('state', self.ACTIVE)
+        self.active_until = self.now() + max(0, state.get('active_for', self.idle_after) - elapsed)
+        self.idle_polls = state.get('idle_polls', 0)
+        self.device_connected = state.get('device_connected', False)
+
+    def interval(self):
+        """Get the seconds to wait before the next poll"""
+        if self.state == self.ACTIVE:
+            return self.active_interval
+        interval = min(self.idle_max_interval, self.idle_min_interval * 2 ** self.idle_polls)
+        if self.device_connected:
+            interval = min(interval, self.device_interval)
+        return interval
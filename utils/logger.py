@@ -16,13 +16,31 @@ def setup_logger(name, log_file, level=logging.DEBUG):
         '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
     )
     
+    # The root driver and the unprivileged services share this directory, so
+    # create missing files writable by both rather than owned by whoever
+    # happened to start first
+    log_path = os.path.join(logs_dir, log_file)
+    try:
+        fd = os.open(log_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+        os.fchmod(fd, 0o666)  # Not narrowed by the umask
+        os.close(fd)
+    except OSError:
+        pass  # Already exists, or reported below if it can't be opened
+
     # Create rotating file handler
     # Max size of 1MB, keep 3 backup files
-    handler = RotatingFileHandler(
-        os.path.join(logs_dir, log_file),
-        maxBytes=1024*1024,  # 1MB
-        backupCount=3
-    )
+    try:
+        handler = RotatingFileHandler(
+            log_path,
+            maxBytes=1024*1024,  # 1MB
+            backupCount=3
+        )
+    except OSError as e:
+        # Log to stderr (the journal) rather than crash-looping the service
+        handler = logging.StreamHandler()
+        fallback_reason = e
+    else:
+        fallback_reason = None
     handler.setFormatter(formatter)
     
     # Create logger
@@ -34,5 +52,7 @@ def setup_logger(name, log_file, level=logging.DEBUG):
     
     # Add the rotating handler
     logger.addHandler(handler)
+    if fallback_reason is not None:
+        logger.warning(f"Can't write {log_path} ({fallback_reason}), logging to stderr")
     
     return logger
\ No newline at end of file
@@ -0,0 +1,14 @@
+from config import get_matrix_options
+
+def create_matrix():
+    """Create the RGBMatrix using the configured options (requires root)
+
+    Kept apart from display_manager so the root-only driver imports nothing
+    but rgbmatrix and config, and opens no log files besides its own.
+    """
+    from rgbmatrix import RGBMatrix, RGBMatrixOptions
+
+    options = RGBMatrixOptions()
+    for key, value in get_matrix_options().items():
+        setattr(options, key, value)
+    return RGBMatrix(options=options)
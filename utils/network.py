@@ -1,31 +1,47 @@
 import time
-import requests
+import socket
 from utils.logger import setup_logger
-from config import NETWORK_CHECK_URL
+from utils.resilience import backoff_delay
+from config import NETWORK_CHECK_HOST, NETWORK_CHECK_PORT
 
 logger = setup_logger('network', 'network.log')
 
-def check_network():
-    """Check if network is available"""
+def check_network(timeout=3):
+    """Check if network is available
+
+    Resolves and opens a TCP connection to the Spotify API host, which proves
+    DNS and routing work without paying for a TLS handshake and HTTPS GET.
+    """
     try:
-        response = requests.get(NETWORK_CHECK_URL, timeout=5)
-        return response.status_code == 200
-    except Exception as e:
+        with socket.create_connection((NETWORK_CHECK_HOST, NETWORK_CHECK_PORT), timeout=timeout):
+            return True
+    except OSError as e:
         logger.error(f"Network check failed: {e}")
         return False
 
-def wait_for_network(max_attempts=30, delay=10):
-    """Wait for network connection"""
+def wait_for_network(timeout=15, base_delay=0.5, max_delay=4):
+    """Wait briefly for a network connection, backing off between attempts
+
+    Gives up after about `timeout` seconds. This only spares the first polls
+    from failing while Wi-Fi comes up; callers keep running without a network
+    and let their own backoff retry, so there is no point blocking longer.
+    """
     logger.info("Waiting for network connection...")
+    deadline = time.monotonic() + timeout
+    attempt = 0
     
-    for attempt in range(max_attempts):
+    while True:
         if check_network():
             logger.info("Network connection established")
             return True
         
-        if attempt < max_attempts - 1:
-            logger.info(f"Network check failed, retrying in {delay} seconds...")
-            time.sleep(delay)
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            break
+        delay = min(remaining, backoff_delay(attempt, base_delay, max_delay))
+        logger.info(f"Network check failed, retrying in {delay:.1f} seconds...")
+        time.sleep(delay)
+        attempt += 1
     
     logger.error("Failed to establish network connection")
-    return False 
\ No newline at end of file
+    return False
@@ -0,0 +1,57 @@
+import time
+import heapq
+import threading
+from utils.logger import setup_logger
+
+logger = setup_logger('scheduler', 'scheduler.log')
+
+class PollScheduler:
+    def __init__(self, min_interval=2.0, max_requests_per_second=2.0):
+        """Spread playback polls for many accounts under one shared request budget
+
+        Each account is polled at most every min_interval seconds. Once there
+        are more accounts than the budget allows, the per-account interval
+        stretches so the total request rate never exceeds
+        max_requests_per_second. A 429 from any account pauses every poll.
+        """
+        self.min_interval = min_interval
+        self.max_requests_per_second = max_requests_per_second
+        self._queue = []  # Heap of (due time, sequence, key)
+        self._sequence = 0
+        self._paused_until = 0
+        self._lock = threading.Lock()
+
+    def interval(self):
+        """Get the current per-account poll interval in seconds"""
+        count = max(len(self._queue), 1)
+        return max(self.min_interval, count / self.max_requests_per_second)
+
+    def _push(self, key, due):
+        """Queue a key (caller holds the lock)"""
+        heapq.heappush(self._queue, (due, self._sequence, key))
+        self._sequence += 1
+
+    def add(self, key):
+        """Register an account, staggering it behind the ones already queued"""
+        with self._lock:
+            due = time.monotonic() + len(self._queue) / self.max_requests_per_second
+            self._push(key, due)
+
+    def next(self):
+        """Return (key, seconds to wait) for the account due next"""
+        with self._lock:
+            due, _, key = heapq.heappop(self._queue)
+            now = time.monotonic()
+            return key, max(0, due - now, self._paused_until - now)
+
+    def complete(self, key, retry_after=None):
+        """Requeue an account after its poll finished"""
+        with self._lock:
+            now = time.monotonic()
+            if retry_after:
+                logger.warning(f"Rate limited, pausing all polls for {retry_after} seconds")
+                self._paused_until = max(self._paused_until, now + retry_after)
+            # The popped key is not in the heap, so count it when sizing the interval
+            count = len(self._queue) + 1
+            interval = max(self.min_interval, count / self.max_requests_per_second)
+            self._push(key, max(now + interval, self._paused_until))
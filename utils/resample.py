@@ -0,0 +1,111 @@
+import functools
+import numpy as np
+from PIL import Image, ImageFilter
+from utils.logger import setup_logger
+
+logger = setup_logger('resample', 'resample.log')
+
+# Resize tiers for turning album art into 64x64 frames:
+#   fast     JPEG draft decode near the target size, then reduce()/BOX
+#   quality  Lanczos from the full image, then a light unsharp mask, since
+#            LED pixels are large and blur softens album text and edges
+#   area     JPEG draft decode at twice the target size, then a NumPy area
+#            average with cached weights
+TIERS = ('fast', 'quality', 'area')
+
+# Mild on purpose: enough to keep small type legible on large LED pixels
+# without ringing around high-contrast edges
+LED_SHARPEN = ImageFilter.UnsharpMask(radius=0.8, percent=70, threshold=2)
+
+def check_tier(tier):
+    """Raise ValueError for an unknown tier name"""
+    if tier not in TIERS:
+        raise ValueError(f"Unknown resize tier {tier!r}, expected one of {', '.join(TIERS)}")
+    return tier
+
+def draft(image, tier, size=(64, 64)):
+    """Let JPEG decoding scale down for the fast and area tiers
+
+    Must be called after Image.open() and before load(). The decoder picks
+    the smallest DCT scale (1/2, 1/4, 1/8) that is still at least `size`, so
+    a 640px album cover decodes at 80px instead.
+    """
+    if image.format != 'JPEG':
+        return image
+    if tier == 'fast':
+        image.draft('RGB', size)
+    elif tier == 'area':
+        # Keep 2x headroom so the area average still does the final filtering
+        image.draft('RGB', (size[0] * 2, size[1] * 2))
+    return image
+
+@functools.lru_cache(maxsize=32)
+def area_weights(source_length, target_length):
+    """Get the (target, source) matrix that averages source pixels into each target pixel
+
+    Each row holds the fraction of every source pixel covered by that target
+    pixel, normalized to sum to 1. Album art comes in a handful of fixed
+    sizes (640, 300, 64), so these are built once and reused.
+    """
+    scale = source_length / target_length
+    edges = np.arange(target_length + 1) * scale
+    starts, ends = edges[:-1, None], edges[1:, None]
+    pixels = np.arange(source_length)[None, :]
+    overlap = np.clip(np.minimum(ends, pixels + 1) - np.maximum(starts, pixels), 0, None)
+    weights = (overlap / overlap.sum(axis=1, keepdims=True)).astype(np.float32)
+    weights.setflags(write=False)
+    return weights
+
+def area_resize(frame, size=(64, 64)):
+    """Area-average an (h, w, 3) uint8 array down to `size`
+
+    Two matrix products with the cached weights: rows first, which shrinks
+    the data tenfold for a 640px cover, then columns.
+    """
+    height, width, channels = frame.shape
+    rows = area_weights(height, size[1])
+    cols = area_weights(width, size[0])
+    shrunk = rows @ frame.reshape(height, width * channels).astype(np.float32)
+    out = np.tensordot(shrunk.reshape(size[1], width, channels), cols, axes=([1], [1]))
+    return np.clip(out.transpose(0, 2, 1) + 0.5, 0, 255).astype(np.uint8)
+
+def area_resize_batch(frames, size=(64, 64)):
+    """Area-average a sequence of uint8 RGB arrays, of any sizes, into one (n, h, w, 3) array
+
+    Frames go through one at a time so the float scratch space stays at a
+    single cover's worth; stacking whole 640px batches was measured slower.
+    Warmup doesn't use this: ArtPipeline spreads single images over worker
+    processes, which scales better than batching in one. It is kept for
+    tools/bench_resize.py's batch timings.
+    """
+    out = np.empty((len(frames), size[1], size[0], 3), dtype=np.uint8)
+    for i, frame in enumerate(frames):
+        out[i] = area_resize(np.asarray(frame), size)
+    return out
+
+def resize_frame(image, tier, size=(64, 64)):
+    """Resize an RGB image to `size` using a resize tier, returning a new image"""
+    check_tier(tier)
+    if image.mode != 'RGB':
+        converted = image.convert('RGB')
+        try:
+            return resize_frame(converted, tier, size)
+        finally:
+            converted.close()
+    if image.size == size:
+        return image.copy()
+
+    if tier == 'fast':
+        # reduce() is a plain block average, exact when the factor is whole
+        factor_x, factor_y = image.width // size[0], image.height // size[1]
+        if (factor_x * size[0], factor_y * size[1]) == image.size:
+            return image.reduce((factor_x, factor_y))
+        return image.resize(size, Image.Resampling.BOX)
+
+    if tier == 'quality':
+        resized = image.resize(size, Image.Resampling.LANCZOS)
+        sharpened = resized.filter(LED_SHARPEN)
+        resized.close()
+        return sharpened
+
+    return Image.fromarray(area_resize(np.asarray(image), size))
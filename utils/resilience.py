@@ -0,0 +1,94 @@
+import time
+import random
+from utils.logger import setup_logger
+
+logger = setup_logger('resilience', 'resilience.log')
+
+def backoff_delay(attempt, base=1.0, cap=300.0):
+    """Get a jittered exponential backoff delay for the given attempt number
+
+    Uses "full jitter": a random delay between 0 and base * 2^attempt, capped,
+    so many displays recovering from the same outage don't retry in lockstep.
+    The exponent is clamped so days of failures can't overflow a float base.
+    """
+    return random.uniform(0, min(cap, base * (2 ** min(attempt, 30))))
+
+class CircuitOpenError(Exception):
+    """Raised when a call is refused because its circuit breaker is open"""
+
+class CircuitBreaker:
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, name, failure_threshold=3, reset_timeout=5.0, max_reset_timeout=300.0):
+        """Stop calling a failing dependency until it has had time to recover
+
+        After failure_threshold consecutive failures the breaker opens and
+        refuses calls. Once the (jittered, exponentially growing) reset
+        timeout passes, one trial call is let through: success closes the
+        breaker, failure opens it again for longer.
+        """
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.max_reset_timeout = max_reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0  # Consecutive times the breaker has opened
+        self.opened_until = 0
+
+    def allow(self):
+        """Check whether a call may go through right now"""
+        if self.state == self.OPEN and time.monotonic() >= self.opened_until:
+            logger.info(f"{self.name}: trying a call after backing off")
+            self.state = self.HALF_OPEN
+        return self.state != self.OPEN
+
+    def retry_in(self):
+        """Get the seconds until the breaker will allow another call"""
+        if self.state != self.OPEN:
+            return 0
+        return max(0, self.opened_until - time.monotonic())
+
+    def record_success(self):
+        """Record a successful call"""
+        if self.state != self.CLOSED:
+            logger.info(f"{self.name}: recovered, closing circuit")
+        self.state = self.CLOSED
+        self.failures = 0
+        self.trips = 0
+
+    def record_failure(self):
+        """Record a failed call, opening the breaker if needed"""
+        self.failures += 1
+        if self.state == self.HALF_OPEN or self.failures >= self.failure_threshold:
+            delay = self.reset_timeout + backoff_delay(self.trips, self.reset_timeout, self.max_reset_timeout)
+            delay = min(delay, self.max_reset_timeout)
+            self.trips += 1
+            self.state = self.OPEN
+            self.opened_until = time.monotonic() + delay
+            logger.warning(f"{self.name}: {self.failures} consecutive failures, backing off for {delay:.0f}s")
+
+    def snapshot(self):
+        """Get the breaker's state as a JSON-friendly dict"""
+        return {'state': self.state, 'failures': self.failures, 'trips': self.trips, 'open_for': self.retry_in()}
+
+    def restore(self, state, elapsed=0):
+        """Resume from snapshot() taken `elapsed` seconds ago, e.g. before a restart"""
+        self.state = state.get('state', self.CLOSED)
+        self.failures = state.get('failures', 0)
+        self.trips = state.get('trips', 0)
+        self.opened_until = time.monotonic() + max(0, state.get('open_for', 0) - elapsed)
+
+    def call(self, func, *args, **kwargs):
+        """Call func through the breaker, raising CircuitOpenError if it is open"""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} unavailable, retrying in {self.retry_in():.0f}s")
+        try:
+            result = func(*args, **kwargs)
+        except Exception:
+            self.record_failure()
+            raise
+        self.record_success()
+        return result
@@ -0,0 +1,67 @@
+import os
+import json
+import time
+import zlib
+import struct
+from utils.logger import setup_logger
+
+logger = setup_logger('snapshot', 'snapshot.log')
+
+# Snapshot file layout: header (magic, version, state length, frame length,
+# crc32 of everything after the header), JSON state, then the raw RGB888
+# frame that was on the panel (absent when it was blank). It is replaced
+# atomically, so a reader sees either the old snapshot or the new one.
+MAGIC = b'SMSS'
+VERSION = 1
+HEADER = struct.Struct('<4sHxxIII')
+
+def save_snapshot(path, state, frame=None):
+    """Atomically write display state and the current frame's raw bytes"""
+    state = dict(state, saved_at=time.time())
+    encoded = json.dumps(state, separators=(',', ':')).encode('utf-8')
+    frame = bytes(frame or b'')
+    tmp_path = f"{path}.tmp"
+    try:
+        with open(tmp_path, 'wb') as f:
+            f.write(HEADER.pack(MAGIC, VERSION, len(encoded), len(frame), zlib.crc32(frame, zlib.crc32(encoded))))
+            f.write(encoded)
+            f.write(frame)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        logger.error(f"Error saving display snapshot: {e}")
+        return False
+
+def load_snapshot(path, max_age):
+    """Read a snapshot back as (state, frame bytes or None)
+
+    Returns None if there is no snapshot, it is corrupt, or it is older than
+    max_age seconds (after a long outage the panel would only show a stale
+    track, so a cold start is better).
+    """
+    try:
+        with open(path, 'rb') as f:
+            data = f.read()
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        logger.error(f"Error reading display snapshot: {e}")
+        return None
+
+    try:
+        magic, version, state_length, frame_length, crc = HEADER.unpack_from(data, 0)
+        body = data[HEADER.size:]
+        if magic != MAGIC or version != VERSION or len(body) != state_length + frame_length or zlib.crc32(body) != crc:
+            raise ValueError("bad header or checksum")
+        state = json.loads(body[:state_length])
+    except Exception as e:
+        logger.warning(f"Ignoring corrupt display snapshot: {e}")
+        return None
+
+    age = time.time() - state.get('saved_at', 0)
+    if not 0 <= age <= max_age:
+        logger.info(f"Display snapshot is {age:.0f}s old, starting cold")
+        return None
+    return state, (body[state_length:] or None)